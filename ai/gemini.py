@@ -4,6 +4,8 @@ import time
 import json
 import re
 import asyncio
+import atexit
+import threading
 import requests
 from typing import Dict, Any, Optional
 from urllib.parse import quote_plus
@@ -15,6 +17,7 @@ from putergenai import PuterClient
 # --------------------------------------------------
 COOLDOWN_SECONDS = 60
 MAX_RETRIES = 4
+MODEL_CACHE_TTL = 600  # segundos até reconsultar a disponibilidade de um modelo
 
 MODEL_POOL = [
     "gpt-4o",
@@ -30,17 +33,30 @@ class PuterAuth:
         self.username = os.getenv("PUTER_USERNAME")
         self.password = os.getenv("PUTER_PASSWORD")
         self.token: Optional[str] = None
+        self.client: Optional[PuterClient] = None
+        self._login_lock = asyncio.Lock()   # análises concorrentes fazem um login só
 
         if not self.username or not self.password:
             raise RuntimeError("PUTER_USERNAME ou PUTER_PASSWORD não configurado")
 
     async def get_client(self) -> PuterClient:
-        if self.token:
-            return PuterClient(token=self.token, auto_update_models=True)
+        """Cliente logado, reaproveitado (e com a mesma sessão HTTP) entre chamadas."""
+        async with self._login_lock:
+            if self.client is not None:
+                return self.client
 
-        client = PuterClient(auto_update_models=True)
-        self.token = await client.login(self.username, self.password)
-        return PuterClient(token=self.token, auto_update_models=True)
+            client = PuterClient(token=self.token, auto_update_models=True)
+            if not self.token:
+                self.token = await client.login(self.username, self.password)
+            self.client = client
+            return client
+
+    async def reset(self):
+        """Descarta cliente e token (ex.: token expirado); o próximo get_client loga de novo."""
+        if self.client is not None:
+            await self.client.close()
+        self.client = None
+        self.token = None
 
 
 # --------------------------------------------------
@@ -64,13 +80,86 @@ class ModelPool:
         self.cooldown[model] = time.time() + COOLDOWN_SECONDS
 
 
+# --------------------------------------------------
+# SESSÃO (LOOP + CLIENTE + MODELOS)
+# --------------------------------------------------
+class AISession:
+    """
+    Estado de longa duração da camada de IA, compartilhado por todos os
+    GeminiClient do processo:
+    - um único event loop, rodando numa thread própria (a sessão aiohttp do
+      PuterClient fica presa a ele); funciona chamado de dentro de outro loop
+    - login e cliente feitos uma vez só
+    - disponibilidade de cada modelo cacheada por MODEL_CACHE_TTL
+    - cooldown dos modelos do pool
+    """
+
+    def __init__(self):
+        self.auth = PuterAuth()
+        self.pool = ModelPool()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="ai-session", daemon=True)
+        self._thread.start()
+        self._lock = threading.Lock()
+        self._models: Dict[str, Any] = {}   # modelo → (disponível, expira_em)
+
+    def run(self, coro):
+        """Executa `coro` no loop da sessão e espera o resultado (qualquer thread)."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def run_async(self, coro):
+        """Mesma coisa para quem já está num loop, sem bloqueá-lo."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    async def is_model_available(self, model: str) -> bool:
+        cached = self._models.get(model)
+        if cached and cached[1] > time.time():
+            return cached[0]
+
+        client = await self.auth.get_client()
+        available = await client.is_model_available(model)
+        self._models[model] = (available, time.time() + MODEL_CACHE_TTL)
+        return available
+
+    def close(self):
+        with self._lock:
+            if self.loop.is_closed():
+                return
+            if self.auth.client is not None:
+                self.run(self.auth.client.close())
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
+
+
+_session: Optional[AISession] = None
+_session_lock = threading.Lock()
+
+
+def get_ai_session() -> AISession:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = AISession()
+        return _session
+
+
+def _close_session():
+    if _session is not None:
+        _session.close()
+
+
+atexit.register(_close_session)
+
+
 # --------------------------------------------------
 # CLIENTE PRINCIPAL (MANTÉM NOME GeminiClient)
 # --------------------------------------------------
 class GeminiClient:
     def __init__(self):
-        self.pool = ModelPool()
-        self.auth = PuterAuth()
+        self.session = get_ai_session()
+        self.pool = self.session.pool
+        self.auth = self.session.auth
 
     # --------------------------------------------------
     # BUILD PROMPT (INALTERADO)
@@ -151,7 +240,10 @@ Formato obrigatório:
     # API PÚBLICA (SYNC)
     # --------------------------------------------------
     def analyze(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        return asyncio.run(self._analyze_async(context))
+        return self.session.run(self._analyze_async(context))
+
+    async def analyze_async(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.session.run_async(self._analyze_async(context))
 
     # --------------------------------------------------
     # IMPLEMENTAÇÃO ASYNC
@@ -166,7 +258,7 @@ Formato obrigatório:
                 break
 
             try:
-                if not await client.is_model_available(model):
+                if not await self.session.is_model_available(model):
                     raise RuntimeError(f"Modelo indisponível: {model}")
 
                 prompt = self._build_prompt(context)
@@ -200,6 +292,11 @@ Formato obrigatório:
                 last_error = str(e)
                 self.pool.mark_failed(model)
 
+                if "401" in last_error or "unauthorized" in last_error.lower():
+                    # token expirado: refaz o login e segue no próximo modelo
+                    await self.auth.reset()
+                    client = await self.auth.get_client()
+
         raise RuntimeError(f"IA_FALHA: {last_error}")
 
     # --------------------------------------------------
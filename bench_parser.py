@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# bench_parser.py
+"""
+Benchmark dos backends de parse (core/parser.py) sobre o HTML real do
+Goyabu salvo no cache HTTP (.cache/http_cache.sqlite).
+
+    python bench_parser.py [--repeat 3] [--limit 50]
+"""
+
+import argparse
+import time
+
+from core.http_cache import get_http_cache
+from core.parser import available_backends, parse_html
+
+# Mesmos seletores usados pelos scrapers / rules
+SELETORES = {
+    "anime_list": ["article", "article a[href]"],
+    "anime_page": ["script", "a[href]"],
+    "episode_page": ["button.player-tab[data-blogger-url-encrypted]"],
+}
+
+
+def carregar_paginas(limit):
+    paginas = {}
+    for url, classe, html in get_http_cache().iter_entries():
+        if classe in SELETORES and len(paginas.setdefault(classe, [])) < limit:
+            paginas[classe].append(html)
+    return paginas
+
+
+def medir(backend, htmls, seletores, repeat):
+    parse_total = select_total = 0.0
+    for _ in range(repeat):
+        for html in htmls:
+            inicio = time.perf_counter()
+            doc = parse_html(html, backend=backend)
+            meio = time.perf_counter()
+            for css in seletores:
+                for el in doc.select(css):
+                    el.get("href")
+                    el.get_text(" ", strip=True)
+            fim = time.perf_counter()
+
+            parse_total += meio - inicio
+            select_total += fim - meio
+
+    n = len(htmls) * repeat
+    return n / parse_total if parse_total else 0, n / select_total if select_total else 0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--limit", type=int, default=50, help="páginas por tipo")
+    args = ap.parse_args()
+
+    paginas = carregar_paginas(args.limit)
+    if not paginas:
+        print("⚠️ Cache HTTP vazio — rode o scraper antes para salvar páginas")
+        return
+
+    print(f"{'tipo':<14}{'backend':<12}{'páginas':>8}{'parse/s':>12}{'select/s':>12}")
+    for classe, htmls in paginas.items():
+        for backend in available_backends():
+            parse_s, select_s = medir(backend, htmls, SELETORES[classe], args.repeat)
+            print(f"{classe:<14}{backend:<12}{len(htmls):>8}{parse_s:>12.1f}{select_s:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
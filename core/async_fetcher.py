@@ -0,0 +1,176 @@
+# core/async_fetcher.py
+import asyncio
+from urllib.parse import urlsplit
+
+import httpx
+
+from core.fetcher import DEFAULT_HEADERS
+from core.rate_limiter import RATE_LIMITER
+from core.http_cache import get_http_cache
+
+
+class AsyncFetcher:
+    def __init__(self, base_url=None, headers=None, timeout=20, retries=3, fast_mode=False,
+                 per_host=4, max_connections=20, limiter=None, cache=None):
+        """
+        Variante asyncio do Fetcher, com pool de conexões compartilhado.
+        per_host limita quantas requisições ficam em voo por host.
+        cache: HttpCache (padrão: cache compartilhado; cache=False desativa).
+        Uma instância pertence a um único event loop.
+        """
+        self.base_url = base_url
+        self.headers = headers or DEFAULT_HEADERS
+        self.timeout = timeout
+        self.retries = retries
+        self.fast_mode = fast_mode
+        self.per_host = per_host
+        self.max_connections = max_connections
+        self.limiter = limiter or RATE_LIMITER
+        self.cache = get_http_cache() if cache is None else (cache or None)
+        self._client = None
+        self._semaphores = {}
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    def _semaphore(self, url):
+        host = urlsplit(url).netloc
+        sem = self._semaphores.get(host)
+        if sem is None:
+            sem = self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def _delay(self, url):
+        if self.fast_mode:
+            await asyncio.sleep(0.05)  # delay mínimo de 50ms
+        else:
+            await self.limiter.wait_async(url)
+
+    # --------------------------------------------------
+    async def get(self, url, headers=None, timeout=None):
+        """
+        Faz GET assíncrono de uma URL com retries, timeout e headers opcionais.
+        Respostas de páginas conhecidas passam pelo HttpCache.
+        """
+        last_error = None
+        timeout = timeout or self.timeout
+        req_headers = headers or self.headers
+        client = self._get_client()
+
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry and entry.partial:
+            entry = None  # prefixo salvo por get_until não serve como página inteira
+        if entry and entry.fresh:
+            return entry.body
+        if entry:
+            req_headers = {**req_headers, **entry.validators()}
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with self._semaphore(url):
+                    await self._delay(url)
+                    r = await client.get(url, headers=req_headers, timeout=timeout)
+                    self.limiter.feedback(url, r.status_code, r.headers)
+                    if r.status_code == 304 and entry:
+                        self.cache.touch(url)
+                        return entry.body
+                    r.raise_for_status()
+                    if self.cache:
+                        self.cache.store(url, r.text, r.headers)
+                    return r.text
+            except httpx.HTTPError as e:
+                last_error = e
+                print(f"⚠️ AsyncFetcher GET tentativa {attempt} falhou: {e}")
+                if attempt == self.retries:
+                    raise RuntimeError(f"❌ AsyncFetcher erro ao acessar {url}: {last_error}")
+
+    # --------------------------------------------------
+    async def get_until(self, url, stop, headers=None, timeout=None, chunk_size=16384):
+        """
+        Versão assíncrona de Fetcher.get_until: lê em blocos e fecha a
+        conexão quando stop(texto_lido) for verdadeiro. Retorna (texto, completo).
+        """
+        last_error = None
+        timeout = timeout or self.timeout
+        req_headers = headers or self.headers
+        client = self._get_client()
+
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry and entry.fresh:
+            return entry.body, not entry.partial
+        if entry:
+            req_headers = {**req_headers, **entry.validators()}
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with self._semaphore(url):
+                    await self._delay(url)
+                    async with client.stream("GET", url, headers=req_headers, timeout=timeout) as r:
+                        self.limiter.feedback(url, r.status_code, r.headers)
+                        if r.status_code == 304 and entry:
+                            self.cache.touch(url)
+                            return entry.body, not entry.partial
+                        r.raise_for_status()
+
+                        text = ""
+                        async for chunk in r.aiter_text(chunk_size):
+                            text += chunk
+                            if stop(text):
+                                if self.cache:
+                                    self.cache.store(url, text, r.headers, partial=True)
+                                return text, False
+
+                    if self.cache:
+                        self.cache.store(url, text, r.headers)
+                    return text, True
+            except httpx.HTTPError as e:
+                last_error = e
+                print(f"⚠️ AsyncFetcher GET tentativa {attempt} falhou: {e}")
+                if attempt == self.retries:
+                    raise RuntimeError(f"❌ AsyncFetcher erro ao acessar {url}: {last_error}")
+
+    # --------------------------------------------------
+    async def get_json(self, url, headers=None, timeout=None):
+        """
+        Faz GET assíncrono de uma URL que retorna JSON, com retries e timeout.
+        """
+        last_error = None
+        timeout = timeout or self.timeout
+        req_headers = headers or self.headers
+        client = self._get_client()
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                async with self._semaphore(url):
+                    await self._delay(url)
+                    r = await client.get(url, headers=req_headers, timeout=timeout)
+                    self.limiter.feedback(url, r.status_code, r.headers)
+                    r.raise_for_status()
+                    return r.json()
+            except httpx.HTTPError as e:
+                last_error = e
+                print(f"⚠️ AsyncFetcher JSON tentativa {attempt} falhou: {e}")
+                if attempt == self.retries:
+                    raise RuntimeError(f"❌ AsyncFetcher JSON erro {url}: {last_error}")
+
+    # --------------------------------------------------
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
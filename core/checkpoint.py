@@ -0,0 +1,82 @@
+# core/checkpoint.py
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from core.storage import atomic_write_json
+
+
+class Checkpoint:
+    """
+    Progresso do crawl salvo em disco para retomar depois de timeout/crash:
+    - última página da lista concluída
+    - animes concluídos
+    - episódios já resolvidos do anime em andamento
+    - fila de retry pendente
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.ultima_pagina = 0
+        self.animes = set()
+        self.episodios: Dict[str, Dict[str, Any]] = {}
+        self.fila_retry: List[Dict[str, Any]] = []
+
+    # --------------------------------------------------
+    @classmethod
+    def load(cls, path) -> "Checkpoint":
+        ckpt = cls(path)
+        if not ckpt.path.exists():
+            return ckpt
+
+        try:
+            data = json.loads(ckpt.path.read_text(encoding="utf-8"))
+        except Exception:
+            # checkpoint ilegível equivale a começar do zero
+            return ckpt
+
+        ckpt.ultima_pagina = data.get("ultima_pagina", 0)
+        ckpt.animes = set(data.get("animes", []))
+        ckpt.episodios = data.get("episodios", {})
+        ckpt.fila_retry = data.get("fila_retry", [])
+        return ckpt
+
+    def save(self):
+        atomic_write_json(self.path, {
+            "ultima_pagina": self.ultima_pagina,
+            "animes": sorted(self.animes),
+            "episodios": self.episodios,
+            "fila_retry": self.fila_retry,
+            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+
+    # --------------------------------------------------
+    def episodios_de(self, anime_url) -> Dict[str, Any]:
+        """Episódios já resolvidos de um anime, por ID."""
+        return self.episodios.get(anime_url, {})
+
+    def marcar_episodio(self, anime_url, ep_id, entry):
+        self.episodios.setdefault(anime_url, {})[ep_id] = entry
+
+    def concluir_anime(self, anime_url):
+        self.animes.add(anime_url)
+        self.episodios.pop(anime_url, None)
+
+    def concluir_pagina(self, pagina):
+        self.ultima_pagina = pagina
+        self.save()
+
+    def reiniciar(self):
+        """Fim de um crawl completo: zera o progresso mas mantém a fila de retry."""
+        self.ultima_pagina = 0
+        self.animes = set()
+        self.episodios = {}
+        self.save()
+
+    def agendar_retry(self, anime):
+        if all(a.get("link") != anime.get("link") for a in self.fila_retry):
+            self.fila_retry.append(anime)
+
+    def remover_retry(self, anime_url):
+        self.fila_retry = [a for a in self.fila_retry if a.get("link") != anime_url]
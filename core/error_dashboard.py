@@ -2,6 +2,7 @@
 # core/error_dashboard.py
 
 import json
+import os
 import time
 from pathlib import Path
 from hashlib import md5
@@ -49,31 +50,84 @@ def salvar_dashboard(data: Dict[str, Any]):
         encoding="utf-8"
     )
 
+# --------------------------------------------------
+# CURSOR DO Erros.txt
+# --------------------------------------------------
+# O Erros.txt só cresce: o dashboard guarda até onde já foi lido
+# (offset em bytes + inode) e cada execução parseia só o final novo.
+# O checkout do CI recria o arquivo com outro inode, então o cursor
+# também guarda um hash dos bytes logo antes do offset para reconhecer
+# o mesmo conteúdo; se não bater (arquivo truncado/trocado), relê tudo.
+ASSINATURA_BYTES = 256
+
+
+def _assinatura(f, offset: int) -> str:
+    inicio = max(0, offset - ASSINATURA_BYTES)
+    f.seek(inicio)
+    return md5(f.read(offset - inicio)).hexdigest()
+
+
+def _offset_valido(f, cursor: Dict[str, Any], st) -> int:
+    offset = cursor.get("offset", 0)
+    if not offset or offset > st.st_size:
+        return 0
+    if cursor.get("inode") == st.st_ino:
+        return offset
+    if _assinatura(f, offset) == cursor.get("assinatura"):
+        return offset
+    return 0
+
 # --------------------------------------------------
 # PARSE DE ERROS
 # --------------------------------------------------
-def parse_erros() -> List[Dict[str, Any]]:
+def parse_erros(cursor: Dict[str, Any] = None) -> List[Dict[str, Any]]:
     """
     Lê o Erros.txt e transforma em lista de dicionários normalizados.
+    Com `cursor` (dict do dashboard), lê só a partir do offset salvo e o
+    atualiza no lugar para o fim do último bloco fechado: um bloco só
+    conta depois da linha em branco que o encerra (ou do próximo
+    separador); um bloco ainda aberto é relido inteiro na próxima vez.
     """
     erros: List[Dict[str, Any]] = []
 
     if not ERROS_FILE.exists():
         return erros
 
-    with open(ERROS_FILE, "r", encoding="utf-8") as f:
-        bloco: Dict[str, Any] = {}
+    with open(ERROS_FILE, "rb") as f:
+        st = os.fstat(f.fileno())
+        offset = _offset_valido(f, cursor, st) if cursor is not None else 0
+        f.seek(offset)
 
-        for linha in f:
-            linha = linha.strip()
+        # O cursor sempre para no início de um bloco ou fora de um;
+        # linhas soltas antes do próximo separador não são campos
+        bloco: Dict[str, Any] = None
+        inicio_bloco = lido = offset
 
-            if not linha:
-                continue
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # linha ainda sendo escrita; fica para a próxima leitura
+            pos = lido
+            lido += len(raw)
+            linha = raw.decode("utf-8", errors="replace").strip()
 
-            # Separador de bloco
+            # Separador: fecha o bloco anterior e abre outro
             if linha.startswith("=" * 60):
-                _finalizar_bloco(bloco, erros)
+                if bloco:
+                    _finalizar_bloco(bloco, erros)
                 bloco = {}
+                inicio_bloco = pos
+                continue
+
+            if bloco is None:
+                offset = lido
+                continue
+
+            # Linha em branco encerra o bloco
+            if not linha:
+                if bloco:
+                    _finalizar_bloco(bloco, erros)
+                    bloco = None
+                    offset = lido
                 continue
 
             # Campo
@@ -81,8 +135,15 @@ def parse_erros() -> List[Dict[str, Any]]:
                 k, v = linha.split(":", 1)
                 bloco[k.strip()] = v.strip()
 
-        # Último bloco
-        _finalizar_bloco(bloco, erros)
+        # Bloco ainda aberto: o cursor fica no separador dele
+        offset = inicio_bloco if bloco is not None else offset
+
+        if cursor is not None:
+            cursor.update({
+                "offset": offset,
+                "inode": st.st_ino,
+                "assinatura": _assinatura(f, offset),
+            })
 
     return erros
 
@@ -122,9 +183,10 @@ def atualizar_dashboard():
     dashboard.setdefault("errors", [])
 
     # 🔁 MIGRAÇÃO AUTOMÁTICA DE ERROS ANTIGOS (SEM error_id)
-    existentes: Dict[str, Dict[str, Any]] = {}
+    # error_id → posição em dashboard["errors"]: dedup O(1) por erro novo
+    indice: Dict[str, int] = {}
 
-    for e in dashboard["errors"]:
+    for i, e in enumerate(dashboard["errors"]):
         if "error_id" not in e or not e["error_id"]:
             tipo = e.get("type", "")
             url = e.get("url", "")
@@ -132,16 +194,17 @@ def atualizar_dashboard():
             stage = e.get("stage", "")
             e["error_id"] = gerar_id(f"{tipo}|{url}|{anime}|{stage}")
 
-        existentes[e["error_id"]] = e
+        indice.setdefault(e["error_id"], i)
 
-    # Parse de novos erros vindos do Erros.txt
-    novos_erros = parse_erros()
+    # Parse só do trecho novo do Erros.txt
+    cursor = dashboard.setdefault("erros_cursor", {})
+    novos_erros = parse_erros(cursor)
 
     # Adiciona apenas erros realmente novos
     for erro in novos_erros:
-        if erro["error_id"] not in existentes:
+        if erro["error_id"] not in indice:
+            indice[erro["error_id"]] = len(dashboard["errors"])
             dashboard["errors"].append(erro)
-            existentes[erro["error_id"]] = erro
 
     # Estatísticas rápidas
     dashboard["stats"] = {
@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
 # core/error_logger.py
+import atexit
 import json
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+from core.storage import JsonlJournal, atomic_write_json
 
 # --------------------------------------------------
 # PATHS
@@ -13,6 +18,10 @@ BASE_DIR.mkdir(parents=True, exist_ok=True)
 
 HUMAN_LOG = BASE_DIR / "Erros.txt"
 DASHBOARD = BASE_DIR / "dashboard.json"
+EVENTS_LOG = BASE_DIR / "events.jsonl"   # erros ainda não consolidados no dashboard
+
+SNAPSHOT_A_CADA = 100       # erros acumulados antes de regravar o dashboard
+SNAPSHOT_INTERVALO = 30.0   # segundos máximos com erros fora do snapshot
 
 # --------------------------------------------------
 # HELPERS
@@ -22,27 +31,7 @@ def _now() -> str:
     return datetime.utcnow().isoformat()
 
 
-def _load_dashboard() -> Dict[str, Any]:
-    """Carrega dashboard JSON com fallback seguro"""
-    if DASHBOARD.exists():
-        try:
-            data = json.loads(DASHBOARD.read_text(encoding="utf-8"))
-            if "errors" not in data or "stats" not in data:
-                # Corrige dashboard inválido
-                data = {
-                    "errors": [],
-                    "stats": {
-                        "total": 0,
-                        "fixed": 0,
-                        "pending": 0,
-                        "by_type": {}
-                    }
-                }
-            return data
-        except Exception:
-            pass
-
-    # Cria dashboard inicial se não existir ou estiver corrompido
+def _novo_dashboard() -> Dict[str, Any]:
     return {
         "errors": [],
         "stats": {
@@ -54,12 +43,215 @@ def _load_dashboard() -> Dict[str, Any]:
     }
 
 
-def _save_dashboard(data: Dict[str, Any]):
-    """Salva dashboard JSON"""
-    DASHBOARD.write_text(
-        json.dumps(data, indent=2, ensure_ascii=False),
-        encoding="utf-8"
-    )
+def _load_dashboard(path: Path = DASHBOARD) -> Dict[str, Any]:
+    """Carrega dashboard JSON com fallback seguro"""
+    if path.exists():
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if "errors" not in data or "stats" not in data:
+                # Corrige dashboard inválido
+                data = _novo_dashboard()
+            return data
+        except Exception:
+            pass
+
+    # Cria dashboard inicial se não existir ou estiver corrompido
+    return _novo_dashboard()
+
+
+def _save_dashboard(data: Dict[str, Any], path: Path = DASHBOARD):
+    """Salva dashboard JSON (troca atômica)"""
+    atomic_write_json(path, data)
+
+
+def _mtime(path: Path):
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _chave(error: Dict[str, Any]):
+    """Ocorrências com o mesmo (type, url, stage) viram um único registro."""
+    return error.get("type"), error.get("url"), error.get("stage")
+
+# --------------------------------------------------
+# STORE
+# --------------------------------------------------
+class ErrorStore:
+    """
+    Erros do processo em memória + log de eventos append-only.
+    - cada ocorrência vira uma linha em events.jsonl (O(1) por erro) e é
+      agregada no registro aberto de mesmo (type, url, stage): occurrences,
+      first_seen, last_seen e a última message; "attempts" continua sendo
+      das tentativas de correção
+    - dashboard.json é um snapshot derivado, regravado a cada SNAPSHOT_A_CADA
+      erros, a cada SNAPSHOT_INTERVALO segundos e no exit; depois do snapshot
+      o log de eventos é descartado
+    - "fixed" também vira evento: as transições são acumuladas e entram no
+      mesmo snapshot atômico, em vez de regravar o dashboard a cada anime
+    - eventos que ficaram no log após um crash são reaplicados na próxima carga
+    - índice url → registros para as consultas do crawler sem reler o JSON
+    """
+
+    def __init__(self, dashboard_path=DASHBOARD, events_path=EVENTS_LOG):
+        self.dashboard_path = Path(dashboard_path)
+        self.events = JsonlJournal(events_path, fsync_every=20)
+        self._lock = threading.RLock()
+        self._pendentes: List[Dict[str, Any]] = []   # eventos fora do snapshot, em ordem
+        self._ultimo_snapshot = time.monotonic()
+        self._carregar()
+
+        self.seq = self.dashboard.get("events_seq", 0)
+        for evento in self.events.read():
+            if evento.get("seq", 0) > self.seq:
+                self.seq = evento["seq"]
+                self._pendentes.append(evento)
+                self._reaplicar(evento)
+
+    def _carregar(self):
+        self.dashboard = _load_dashboard(self.dashboard_path)
+        self._mtime = _mtime(self.dashboard_path)
+
+        self._por_chave: Dict[Any, int] = {}       # chave → registro aberto
+        self._por_url: Dict[str, List[int]] = {}   # url → registros
+        for i, e in enumerate(self.dashboard["errors"]):
+            self._indexar(i, e)
+
+    def _indexar(self, i: int, e: Dict[str, Any]):
+        if not e.get("fixed"):
+            self._por_chave[_chave(e)] = i
+        if e.get("url"):
+            self._por_url.setdefault(e["url"], []).append(i)
+
+    def _aplicar(self, error: Dict[str, Any]):
+        """Agrega a ocorrência e atualiza as estatísticas incrementalmente."""
+        errors = self.dashboard.setdefault("errors", [])
+        stats = self.dashboard.setdefault("stats", {})
+        stats["occurrences"] = stats.get("occurrences", 0) + 1
+
+        i = self._por_chave.get(_chave(error))
+        if i is not None and not errors[i].get("fixed"):
+            e = errors[i]
+            e["occurrences"] = e.get("occurrences", 1) + 1
+            e.setdefault("first_seen", e.get("timestamp"))
+            e["last_seen"] = error["timestamp"]
+            e["message"] = error["message"]
+            return
+
+        # primeira ocorrência (ou o erro voltou depois de corrigido)
+        e = dict(error, occurrences=1, first_seen=error["timestamp"], last_seen=error["timestamp"])
+        errors.append(e)
+        self._indexar(len(errors) - 1, e)
+
+        stats["total"] = stats.get("total", 0) + 1
+        stats["pending"] = stats.get("pending", 0) + 1
+        by_type = stats.setdefault("by_type", {})
+        by_type[e["type"]] = by_type.get(e["type"], 0) + 1
+
+    def _reaplicar(self, evento: Dict[str, Any]):
+        if "error" in evento:
+            self._aplicar(evento["error"])
+        elif "fixed" in evento:
+            self._corrigir(evento["fixed"])
+
+    def _corrigir(self, url: str) -> bool:
+        mudou = False
+        stats = self.dashboard.setdefault("stats", {})
+        for e in self.errors_for(url):
+            if not e.get("fixed"):
+                e["fixed"] = True
+                e["pending_retry"] = False
+                stats["fixed"] = stats.get("fixed", 0) + 1
+                stats["pending"] = max(0, stats.get("pending", 0) - 1)
+                mudou = True
+        return mudou
+
+    # --------------------------------------------------
+    # CONSULTAS (O(1) por url)
+    # --------------------------------------------------
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return self.dashboard["stats"]
+
+    def errors_for(self, url: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            errors = self.dashboard["errors"]
+            return [errors[i] for i in self._por_url.get(url, ())]
+
+    def mapped_title(self, url: str):
+        for e in self.errors_for(url):
+            if e.get("mapped_title"):
+                return e["mapped_title"]
+        return None
+
+    # --------------------------------------------------
+    # ESCRITA
+    # --------------------------------------------------
+    def _registrar(self, evento: Dict[str, Any]):
+        self.seq += 1
+        evento = dict(evento, seq=self.seq)
+        self.events.append(evento)
+        self._pendentes.append(evento)
+
+        if (
+            len(self._pendentes) >= SNAPSHOT_A_CADA
+            or time.monotonic() - self._ultimo_snapshot >= SNAPSHOT_INTERVALO
+        ):
+            self.snapshot()
+
+    def add(self, error: Dict[str, Any]):
+        with self._lock:
+            self._aplicar(error)
+            self._registrar({"error": error})
+
+    def mark_fixed(self, url: str):
+        """Fecha os erros abertos da url (fixed=True, pending_retry=False) no próximo snapshot."""
+        with self._lock:
+            if self._corrigir(url):
+                self._registrar({"fixed": url})
+
+    def snapshot(self):
+        """Grava dashboard.json com o que está pendente e descarta o log de eventos."""
+        with self._lock:
+            self._ultimo_snapshot = time.monotonic()
+            if not self._pendentes:
+                return
+
+            if _mtime(self.dashboard_path) != self._mtime:
+                # alterado por fora (autofix, error_dashboard):
+                # parte da versão em disco e reaplica só o que é nosso
+                self._carregar()
+                for evento in self._pendentes:
+                    self._reaplicar(evento)
+
+            self.dashboard["events_seq"] = self.seq
+            _save_dashboard(self.dashboard, self.dashboard_path)
+            self._mtime = _mtime(self.dashboard_path)
+
+            self._pendentes.clear()
+            self.events.discard()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_error_store() -> ErrorStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ErrorStore()
+        return _store
+
+
+def flush_errors():
+    """Força o snapshot do dashboard (também roda no exit)."""
+    if _store is not None:
+        _store.snapshot()
+
+
+atexit.register(flush_errors)
 
 # --------------------------------------------------
 # API PRINCIPAL
@@ -73,7 +265,7 @@ def log_error(
     message: str
 ) -> Dict[str, Any]:
     """
-    Log humano + dashboard de erros (JSON self-healing)
+    Log humano + evento de erro (dashboard JSON derivado, self-healing)
     Retorna dict do erro
     """
 
@@ -96,25 +288,8 @@ def log_error(
             f"{message}\n\n"
         )
 
-    # Log JSON (dashboard)
-    dashboard = _load_dashboard()
-    dashboard.setdefault("errors", [])
-    dashboard.setdefault("stats", {
-        "total": 0,
-        "fixed": 0,
-        "pending": 0,
-        "by_type": {}
-    })
-
-    dashboard["errors"].append(error)
-
-    # Estatísticas
-    stats = dashboard["stats"]
-    stats["total"] += 1
-    stats["pending"] += 1
-    stats["by_type"].setdefault(error_type, 0)
-    stats["by_type"][error_type] += 1
-
-    _save_dashboard(dashboard)
+    # Evento (agregado no dashboard em memória; o chamador pode anexar
+    # campos como "html" ao dict retornado sem que vão para o snapshot)
+    get_error_store().add(dict(error))
 
-    return error
\ No newline at end of file
+    return error
@@ -1,8 +1,11 @@
 # core/fetcher.py
+import codecs
 import time
-import random
 import requests
 
+from core.rate_limiter import RATE_LIMITER
+from core.http_cache import get_http_cache
+
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
                   "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -14,38 +17,59 @@ DEFAULT_HEADERS = {
 
 
 class Fetcher:
-    def __init__(self, base_url=None, headers=None, timeout=20, retries=3, fast_mode=False):
+    def __init__(self, base_url=None, headers=None, timeout=20, retries=3, fast_mode=False, limiter=None,
+                 cache=None):
         """
         fast_mode=True desativa delays longos para testes rápidos.
+        limiter: RateLimiter por host (padrão: RATE_LIMITER compartilhado).
+        cache: HttpCache (padrão: cache compartilhado; cache=False desativa).
         """
         self.base_url = base_url
         self.headers = headers or DEFAULT_HEADERS
         self.timeout = timeout
         self.retries = retries
         self.fast_mode = fast_mode
+        self.limiter = limiter or RATE_LIMITER
+        self.cache = get_http_cache() if cache is None else (cache or None)
         self.session = requests.Session()
         self.session.headers.update(self.headers)
 
-    def _delay(self):
+    def _delay(self, url):
         if self.fast_mode:
             time.sleep(0.05)  # delay mínimo de 50ms
         else:
-            time.sleep(random.uniform(0.8, 1.8))
+            # só espera quando o orçamento do host acabou
+            self.limiter.wait(url)
 
     # --------------------------------------------------
     def get(self, url, headers=None, timeout=None):
         """
         Faz GET de uma URL com retries, timeout e headers opcionais.
+        Respostas de páginas conhecidas passam pelo HttpCache.
         """
         last_error = None
         timeout = timeout or self.timeout
         req_headers = headers or self.headers
 
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry and entry.partial:
+            entry = None  # prefixo salvo por get_until não serve como página inteira
+        if entry and entry.fresh:
+            return entry.body
+        if entry:
+            req_headers = {**req_headers, **entry.validators()}
+
         for attempt in range(1, self.retries + 1):
             try:
-                self._delay()
+                self._delay(url)
                 r = self.session.get(url, headers=req_headers, timeout=timeout)
+                self.limiter.feedback(url, r.status_code, r.headers)
+                if r.status_code == 304 and entry:
+                    self.cache.touch(url)
+                    return entry.body
                 r.raise_for_status()
+                if self.cache:
+                    self.cache.store(url, r.text, r.headers)
                 return r.text
             except requests.exceptions.RequestException as e:
                 last_error = e
@@ -53,6 +77,53 @@ class Fetcher:
                 if attempt == self.retries:
                     raise RuntimeError(f"❌ Fetcher erro ao acessar {url}: {last_error}")
 
+    # --------------------------------------------------
+    def get_until(self, url, stop, headers=None, timeout=None, chunk_size=16384):
+        """
+        GET em streaming: lê a resposta em blocos e fecha a conexão assim
+        que stop(texto_lido) for verdadeiro. Retorna (texto, completo).
+        Leituras interrompidas entram no HttpCache como parciais (com os
+        validators), servidas de novo só por get_until.
+        """
+        last_error = None
+        timeout = timeout or self.timeout
+        req_headers = headers or self.headers
+
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry and entry.fresh:
+            return entry.body, not entry.partial
+        if entry:
+            req_headers = {**req_headers, **entry.validators()}
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                self._delay(url)
+                with self.session.get(url, headers=req_headers, timeout=timeout, stream=True) as r:
+                    self.limiter.feedback(url, r.status_code, r.headers)
+                    if r.status_code == 304 and entry:
+                        self.cache.touch(url)
+                        return entry.body, not entry.partial
+                    r.raise_for_status()
+
+                    decoder = codecs.getincrementaldecoder(r.encoding or "utf-8")(errors="replace")
+                    text = ""
+                    for chunk in r.iter_content(chunk_size):
+                        text += decoder.decode(chunk)
+                        if stop(text):
+                            if self.cache:
+                                self.cache.store(url, text, r.headers, partial=True)
+                            return text, False
+                    text += decoder.decode(b"", final=True)
+
+                if self.cache:
+                    self.cache.store(url, text, r.headers)
+                return text, True
+            except requests.exceptions.RequestException as e:
+                last_error = e
+                print(f"⚠️ Fetcher GET tentativa {attempt} falhou: {e}")
+                if attempt == self.retries:
+                    raise RuntimeError(f"❌ Fetcher erro ao acessar {url}: {last_error}")
+
     # --------------------------------------------------
     def get_json(self, url, headers=None, timeout=None):
         """
@@ -64,8 +135,9 @@ class Fetcher:
 
         for attempt in range(1, self.retries + 1):
             try:
-                self._delay()
+                self._delay(url)
                 r = self.session.get(url, headers=req_headers, timeout=timeout)
+                self.limiter.feedback(url, r.status_code, r.headers)
                 r.raise_for_status()
                 return r.json()
             except requests.exceptions.RequestException as e:
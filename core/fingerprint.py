@@ -0,0 +1,129 @@
+# core/fingerprint.py
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+
+from core.storage import atomic_write_json
+
+FINGERPRINTS_FILE = Path(__file__).resolve().parent.parent / "rules" / "fingerprints.json"
+
+# região principal: <main>...</main>, senão <body>...</body>
+_REGIOES = (
+    (re.compile(r"<main\b", re.I), re.compile(r"</main\s*>", re.I)),
+    (re.compile(r"<body\b", re.I), re.compile(r"</body\s*>", re.I)),
+)
+_SCRIPTS = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>", re.I | re.S)
+_TAG = re.compile(r"<([a-zA-Z][a-zA-Z0-9-]*)\b([^>]*)>")
+_CLASSE = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+
+# classes de estado não descrevem layout
+_CLASSES_IGNORADAS = {"active", "selected", "current", "show", "hidden", "open"}
+
+
+def page_fingerprint(html):
+    """
+    Hash do esqueleto tag/classe da região principal da página, sem DOM.
+    Insensível a texto, links e quantidade de cards; muda quando o layout muda.
+    """
+    if not html:
+        return None
+
+    inicio, fim = 0, len(html)
+    for abre, fecha in _REGIOES:
+        m = abre.search(html)
+        if m:
+            inicio = m.start()
+            f = fecha.search(html, inicio)
+            if f:
+                fim = f.end()
+            break
+
+    # rodapé e scripts fora da região não mexem no fingerprint
+    regiao = _SCRIPTS.sub("", html[inicio:fim])
+
+    esqueleto = set()
+    for tag, attrs in _TAG.findall(regiao):
+        classes = ""
+        m = _CLASSE.search(attrs)
+        if m:
+            valor = next(v for v in m.groups() if v is not None)
+            classes = ".".join(sorted(c for c in valor.split() if c not in _CLASSES_IGNORADAS))
+        esqueleto.add(f"{tag.lower()}.{classes}" if classes else tag.lower())
+
+    if not esqueleto:
+        return None
+    return hashlib.md5("|".join(sorted(esqueleto)).encode("utf-8")).hexdigest()[:12]
+
+
+class FingerprintStore:
+    """
+    fingerprint → última strategy vencedora, por contexto, em rules/fingerprints.json.
+    Só grava quando um fingerprint precisa de outra strategy: layout novo
+    que a strategy do contexto ainda extrai não ganha entrada. Layout sem
+    vencedora fica só em memória (o aviso sai uma vez por execução).
+    """
+
+    def __init__(self, path=FINGERPRINTS_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.data = {}
+        self._sem_vencedora = set()   # (contexto, fp) desta execução
+        if self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                self.data = {}
+
+    def lookup(self, context, fp):
+        """
+        Retorna (strategy, exata): a que venceu nesse fingerprint ou, num
+        fingerprint sem entrada, a última que venceu no contexto.
+        """
+        with self._lock:
+            vistos = self.data.get(context, {})
+            entry = vistos.get(fp)
+            if entry is not None:
+                return entry.get("strategy"), True
+            if not vistos:
+                return None, False
+            ultima = max(vistos.values(), key=lambda e: e.get("updated_at", ""))
+            return ultima.get("strategy"), False
+
+    def is_new_layout(self, context, fp):
+        with self._lock:
+            vistos = self.data.get(context, {})
+            return bool(vistos) and fp not in vistos and (context, fp) not in self._sem_vencedora
+
+    def remember(self, context, fp, strategy):
+        with self._lock:
+            if strategy is None:
+                self._sem_vencedora.add((context, fp))
+                return
+
+            vistos = self.data.setdefault(context, {})
+            entry = vistos.get(fp)
+            if entry and entry.get("strategy") == strategy:
+                return
+
+            agora = time.strftime("%Y-%m-%d %H:%M:%S")
+            vistos[fp] = {
+                "strategy": strategy,
+                "first_seen": entry.get("first_seen", agora) if entry else agora,
+                "updated_at": agora,
+            }
+            atomic_write_json(self.path, self.data)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_fingerprint_store():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FingerprintStore()
+        return _shared
@@ -0,0 +1,161 @@
+# core/http_cache.py
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+# --------------------------------------------------
+# PATHS
+# --------------------------------------------------
+CACHE_DIR = Path(".cache")
+CACHE_FILE = CACHE_DIR / "http_cache.sqlite"
+
+# --------------------------------------------------
+# TTL POR CLASSE DE URL (segundos)
+# URLs que não casam com nenhuma classe não são cacheadas.
+# --------------------------------------------------
+URL_CLASSES = [
+    ("anime_list", re.compile(r"/lista-de-animes/"), 1 * 3600),
+    ("anime_page", re.compile(r"/anime/"), 6 * 3600),
+    ("episode_page", re.compile(r"^https?://goyabu\.io/\d+/?$"), 30 * 86400),
+]
+
+
+class CacheEntry:
+    def __init__(self, url, body, etag, last_modified, fetched_at, ttl, partial=False):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+        self.partial = partial  # só o começo do corpo (leitura interrompida por get_until)
+
+    @property
+    def fresh(self):
+        return time.time() - self.fetched_at < self.ttl
+
+    def validators(self):
+        """Headers para GET condicional."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    Cache de respostas HTML em SQLite, com corpo comprimido (zlib)
+    e revalidação por ETag / Last-Modified.
+    """
+
+    def __init__(self, path=CACHE_FILE, classes=None):
+        self.path = Path(path)
+        self.classes = URL_CLASSES if classes is None else classes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY,"
+            " body BLOB NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+        colunas = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        if "partial" not in colunas:
+            self._conn.execute("ALTER TABLE responses ADD COLUMN partial INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    # --------------------------------------------------
+    def url_class(self, url):
+        for name, pattern, ttl in self.classes:
+            if pattern.search(url):
+                return name, ttl
+        return None, 0
+
+    def lookup(self, url):
+        _, ttl = self.url_class(url)
+        if not ttl:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at, partial FROM responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+
+        if not row:
+            return None
+
+        body, etag, last_modified, fetched_at, partial = row
+        return CacheEntry(url, zlib.decompress(body).decode("utf-8"), etag, last_modified, fetched_at, ttl,
+                          bool(partial))
+
+    def store(self, url, body, headers=None, partial=False):
+        """partial=True: prefixo do corpo; os validators continuam valendo para o recurso inteiro."""
+        _, ttl = self.url_class(url)
+        if not ttl:
+            return
+
+        headers = headers or {}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, fetched_at, partial)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    zlib.compress(body.encode("utf-8")),
+                    headers.get("ETag"),
+                    headers.get("Last-Modified"),
+                    time.time(),
+                    int(partial)
+                )
+            )
+            self._conn.commit()
+
+    def touch(self, url):
+        """Renova o TTL de uma entrada revalidada com 304."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ? WHERE url = ?",
+                (time.time(), url)
+            )
+            self._conn.commit()
+
+    def iter_entries(self, url_class=None):
+        """
+        (url, classe, corpo) de todas as respostas salvas, opcionalmente de uma
+        classe. Páginas de anime em geral estão parciais (até o allEpisodes).
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT url, body FROM responses").fetchall()
+
+        for url, body in rows:
+            name, _ = self.url_class(url)
+            if url_class is None or name == url_class:
+                yield url, name, zlib.decompress(body).decode("utf-8")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_http_cache():
+    """Cache compartilhado por todos os Fetchers do processo."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpCache()
+        return _shared
@@ -0,0 +1,228 @@
+# core/parser.py
+import os
+import re
+from abc import ABC, abstractmethod
+
+# --------------------------------------------------
+# BACKENDS DISPONÍVEIS
+# Ordem de preferência: selectolax > lxml (+cssselect) > bs4/lxml > bs4/html.parser
+# SCRAPER_PARSER força um backend específico.
+# --------------------------------------------------
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as _SelectolaxParser
+    except ImportError:
+        _SelectolaxParser = None
+
+try:
+    import lxml.html as _lxml_html
+    from lxml import etree as _etree
+    from cssselect import HTMLTranslator as _HTMLTranslator
+except ImportError:
+    _lxml_html = None
+    _HTMLTranslator = None
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+# --------------------------------------------------
+# SHIM DE NÓ (API estilo BeautifulSoup)
+# --------------------------------------------------
+class Node(ABC):
+    """
+    Elemento com a mesma API mínima usada pelos scrapers:
+    select(), select_one(), get(attr) e get_text(sep, strip).
+    select() só considera descendentes, nunca o próprio elemento.
+    """
+
+    @abstractmethod
+    def select(self, css):
+        ...
+
+    def select_one(self, css):
+        found = self.select(css)
+        return found[0] if found else None
+
+    @abstractmethod
+    def get(self, attr, default=None):
+        ...
+
+    @abstractmethod
+    def get_text(self, separator="", strip=False):
+        ...
+
+    def __getitem__(self, attr):
+        value = self.get(attr)
+        if value is None:
+            raise KeyError(attr)
+        return value
+
+
+# Texto que o get_text() do bs4 não devolve; os outros backends seguem o mesmo
+SEM_TEXTO = {"script", "style", "template"}
+
+
+def _join(parts, separator, strip):
+    if strip:
+        parts = [p.strip() for p in parts]
+        parts = [p for p in parts if p]
+    return separator.join(parts)
+
+
+class SelectolaxNode(Node):
+    def __init__(self, node):
+        self._node = node
+
+    def select(self, css):
+        # css() do nó inclui o próprio nó quando ele casa
+        return [SelectolaxNode(n) for n in self._node.css(css) if n != self._node]
+
+    def select_one(self, css):
+        n = self._node.css_first(css)
+        if n is not None and n == self._node:
+            return super().select_one(css)
+        return SelectolaxNode(n) if n is not None else None
+
+    def get(self, attr, default=None):
+        value = self._node.attributes.get(attr)
+        return default if value is None else value
+
+    def get_text(self, separator="", strip=False):
+        # a árvore (documento) não tem traverse(); o texto vem do <html>
+        node = self._node if hasattr(self._node, "traverse") else self._node.root
+        if node is None:
+            return ""
+        parts = [
+            n.text_content for n in node.traverse(include_text=True)
+            if n.tag == "-text" and n.parent.tag not in SEM_TEXTO
+        ]
+        return _join(parts, separator, strip)
+
+
+_SELECTORES = {}  # (CSS, raiz) → XPath compilado (lxml)
+_TEXTOS = None    # XPath dos nós de texto fora de SEM_TEXTO (lxml)
+
+
+def _compilar(css, raiz=False):
+    # CSSSelector usa descendant-or-self::, que casa o próprio elemento
+    # (um card <a> achava a si mesmo em select_one("a")); num nó, só
+    # descendentes. A raiz (<html>) é o único caso em que o próprio
+    # elemento conta, como no documento do bs4.
+    sel = _SELECTORES.get((css, raiz))
+    if sel is None:
+        prefix = "descendant-or-self::" if raiz else "descendant::"
+        xpath = _HTMLTranslator().css_to_xpath(css, prefix=prefix)
+        sel = _SELECTORES[(css, raiz)] = _etree.XPath(xpath)
+    return sel
+
+
+class LxmlNode(Node):
+    def __init__(self, el, raiz=False):
+        self._el = el
+        self._raiz = raiz
+
+    def select(self, css):
+        return [LxmlNode(e) for e in _compilar(css, self._raiz)(self._el)]
+
+    def get(self, attr, default=None):
+        return self._el.get(attr, default)
+
+    def get_text(self, separator="", strip=False):
+        # itertext() inclui o conteúdo de <script>/<style>
+        global _TEXTOS
+        if _TEXTOS is None:
+            fora = " or ".join(f"ancestor::{tag}" for tag in sorted(SEM_TEXTO))
+            _TEXTOS = _etree.XPath(f"descendant-or-self::text()[not({fora})]", smart_strings=False)
+        return _join(_TEXTOS(self._el), separator, strip)
+
+
+class SoupNode(Node):
+    def __init__(self, tag):
+        self._tag = tag
+
+    def select(self, css):
+        return [SoupNode(t) for t in self._tag.select(css)]
+
+    def select_one(self, css):
+        t = self._tag.select_one(css)
+        return SoupNode(t) if t is not None else None
+
+    def get(self, attr, default=None):
+        return self._tag.get(attr, default)
+
+    def get_text(self, separator="", strip=False):
+        return self._tag.get_text(separator, strip=strip)
+
+
+# --------------------------------------------------
+# PARSE
+# --------------------------------------------------
+def _parse_selectolax(html):
+    # a árvore tem css()/css_first() como qualquer nó, mesmo sem <html>
+    return SelectolaxNode(_SelectolaxParser(html))
+
+
+XML_DECL = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+def _parse_lxml(html):
+    # lxml recusa str com declaração de encoding; o texto já está decodificado
+    if isinstance(html, str):
+        html = XML_DECL.sub("", html, count=1)
+    try:
+        doc = _lxml_html.document_fromstring(html)
+    except _etree.ParserError:
+        # vazio ou só comentários: documento vazio, como no bs4
+        doc = _lxml_html.document_fromstring("<html></html>")
+    return LxmlNode(doc, raiz=True)
+
+
+def _parse_bs4_lxml(html):
+    return SoupNode(BeautifulSoup(html, "lxml"))
+
+
+def _parse_bs4(html):
+    return SoupNode(BeautifulSoup(html, "html.parser"))
+
+
+BACKENDS = {
+    "selectolax": (_parse_selectolax, _SelectolaxParser is not None),
+    "lxml": (_parse_lxml, _HTMLTranslator is not None),
+    "bs4-lxml": (_parse_bs4_lxml, BeautifulSoup is not None and _lxml_html is not None),
+    "bs4": (_parse_bs4, BeautifulSoup is not None),
+}
+
+
+def available_backends():
+    return [name for name, (_, ok) in BACKENDS.items() if ok]
+
+
+def default_backend():
+    forced = os.environ.get("SCRAPER_PARSER")
+    if forced:
+        if forced not in BACKENDS or not BACKENDS[forced][1]:
+            raise RuntimeError(f"❌ Parser '{forced}' indisponível (disponíveis: {available_backends()})")
+        return forced
+
+    disponiveis = available_backends()
+    if not disponiveis:
+        raise RuntimeError("❌ Nenhum parser HTML instalado (selectolax, lxml ou bs4)")
+    return disponiveis[0]
+
+
+_backend = None
+
+
+def parse_html(html, backend=None):
+    """Parse com o backend mais rápido disponível; retorna o Node raiz."""
+    global _backend
+    if backend is None:
+        if _backend is None:
+            _backend = default_backend()
+        backend = _backend
+    return BACKENDS[backend][0](html or "")
@@ -0,0 +1,147 @@
+# core/rate_limiter.py
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# --------------------------------------------------
+# LIMITES (requisições/segundo, burst)
+# --------------------------------------------------
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 5
+MIN_RATE = 0.1
+
+HOST_LIMITS = {
+    "graphql.anilist.co": (0.5, 3),  # AniList: ~30 req/min
+}
+
+THROTTLE_STATUS = (429, 503)
+
+
+def parse_retry_after(value):
+    """
+    Converte o header Retry-After (segundos ou data HTTP) em segundos.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket por host. Os tokens são contabilizados no instante
+    `updated`, que pode estar no futuro quando o host pediu pausa.
+    """
+
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self):
+        """Consome um token e retorna quantos segundos esperar antes de usá-lo."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+
+        wait = max(0.0, self.updated - now)
+        if self.tokens < 0:
+            wait += -self.tokens / self.rate
+        return wait
+
+    def penalize(self, retry_after=None):
+        """Reduz a taxa pela metade e, se houver Retry-After, pausa o host."""
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(MIN_RATE, self.rate / 2)
+        self.tokens = min(self.tokens, 0.0)
+        if retry_after:
+            self.updated = max(self.updated, now + retry_after)
+
+    def recover(self):
+        """Recupera a taxa aos poucos depois de respostas bem-sucedidas."""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+
+class RateLimiter:
+    """
+    Registro de token buckets por host, compartilhado entre threads
+    (Fetcher) e corrotinas (AsyncFetcher).
+    """
+
+    def __init__(self, default_rate=DEFAULT_RATE, default_burst=DEFAULT_BURST, limits=None):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.limits = dict(HOST_LIMITS if limits is None else limits)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url):
+        return urlsplit(url).netloc or url
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = self.limits.get(host, (self.default_rate, self.default_burst))
+            bucket = self._buckets[host] = TokenBucket(rate, burst)
+        return bucket
+
+    # --------------------------------------------------
+    def reserve(self, url):
+        with self._lock:
+            return self._bucket(self._host(url)).reserve()
+
+    def wait(self, url):
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def wait_async(self, url):
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    # --------------------------------------------------
+    def penalize(self, url, retry_after=None):
+        with self._lock:
+            self._bucket(self._host(url)).penalize(retry_after)
+
+    def feedback(self, url, status_code, headers=None):
+        """
+        Ajusta o bucket do host a partir da resposta recebida.
+        Retorna o Retry-After em segundos quando o host pediu para desacelerar.
+        """
+        if status_code in THROTTLE_STATUS:
+            retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+            self.penalize(url, retry_after)
+            return retry_after
+
+        if status_code < 400:
+            with self._lock:
+                self._bucket(self._host(url)).recover()
+        return None
+
+
+# Instância única usada por todos os Fetchers e pelo cliente AniList
+RATE_LIMITER = RateLimiter()
@@ -0,0 +1,125 @@
+# core/storage.py
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+
+# --------------------------------------------------
+# ESCRITA ATÔMICA
+# --------------------------------------------------
+def atomic_write_text(path, text: str):
+    """
+    Escreve num arquivo temporário no mesmo diretório e troca com os.replace,
+    de modo que o destino nunca fica pela metade.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def atomic_write_json(path, data: Any, indent: int = 2):
+    atomic_write_text(path, json.dumps(data, indent=indent, ensure_ascii=False))
+
+
+# --------------------------------------------------
+# JOURNAL JSONL (APPEND-ONLY)
+# --------------------------------------------------
+class JsonlJournal:
+    """
+    Journal append-only: um registro JSON por linha.
+    fsync a cada `fsync_every` registros e no close().
+    """
+
+    def __init__(self, path, fsync_every: int = 10):
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self._file = None
+        self._pending = 0
+
+    def _open(self):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+            # isola uma linha truncada deixada por um crash
+            if self._file.tell() > 0:
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._file.write("\n")
+        return self._file
+
+    def append(self, record: Dict[str, Any]):
+        f = self._open()
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    # --------------------------------------------------
+    def read(self) -> List[Dict[str, Any]]:
+        """
+        Lê todos os registros. Uma última linha truncada (crash no meio
+        da escrita) é descartada.
+        """
+        if not self.path.exists():
+            return []
+
+        records = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for linha in f:
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    records.append(json.loads(linha))
+                except json.JSONDecodeError:
+                    continue
+        return records
+
+    def compact(self, output_path, key: str = "url", base: Iterable[Dict[str, Any]] = ()) -> List[Dict[str, Any]]:
+        """
+        Consolida base + journal em output_path (o último registro de cada
+        chave vence) com troca atômica, e então descarta o journal.
+        """
+        self.close()
+
+        merged: Dict[Any, Dict[str, Any]] = {}
+        for record in list(base) + self.read():
+            merged[record.get(key)] = record
+
+        data = list(merged.values())
+        atomic_write_json(output_path, data)
+        self.discard()
+        return data
+
+    def discard(self):
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
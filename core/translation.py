@@ -0,0 +1,169 @@
+# core/translation.py
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from deep_translator import GoogleTranslator
+
+from core.http_cache import CACHE_DIR
+
+CACHE_FILE = CACHE_DIR / "translations.sqlite"
+
+MAX_CHARS = 4500              # limite do Google Translate é 5000 por requisição
+SEPARADOR = "\n\n⁂\n\n"         # marcador entre textos de um mesmo lote
+_SPLIT = re.compile(r"\s*⁂\s*")
+
+
+def chave_texto(texto, source, target):
+    return hashlib.sha256(f"{source}:{target}:{texto}".encode("utf-8")).hexdigest()
+
+
+# --------------------------------------------------
+# CACHE PERSISTENTE
+# --------------------------------------------------
+class TranslationCache:
+    """Traduções em SQLite, por hash do texto original + idiomas."""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY, translated TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT translated FROM translations WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, items):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, translated, created_at) VALUES (?, ?, ?)",
+                [(k, v, time.time()) for k, v in items.items()]
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# --------------------------------------------------
+# TRADUTOR EM LOTE
+# --------------------------------------------------
+class DescriptionTranslator:
+    """
+    Traduz descrições em segundo plano:
+    - textos já traduzidos saem do cache
+    - os demais são empacotados em lotes de até `max_chars` por requisição
+    - prefetch() dispara o lote numa thread e traduzir() só espera se preciso
+    """
+
+    def __init__(self, source="en", target="pt", max_chars=MAX_CHARS, cache=None):
+        self.source = source
+        self.target = target
+        self.max_chars = max_chars
+        self.cache = cache or TranslationCache()
+
+        self._translator = GoogleTranslator(source=source, target=target)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="traducao")
+        self._pendentes = {}  # chave → Future do lote
+        self._lock = threading.Lock()
+
+    def _chave(self, texto):
+        return chave_texto(texto, self.source, self.target)
+
+    # --------------------------------------------------
+    def _lotes(self, textos):
+        lote, tamanho = [], 0
+        for texto in textos:
+            extra = len(texto) + (len(SEPARADOR) if lote else 0)
+            if lote and tamanho + extra > self.max_chars:
+                yield lote
+                lote, tamanho = [], 0
+                extra = len(texto)
+            lote.append(texto)
+            tamanho += extra
+        if lote:
+            yield lote
+
+    def _traduzir_um(self, texto):
+        try:
+            return self._translator.translate(texto[:self.max_chars]) or ""
+        except Exception as e:
+            print(f"⚠️ Falha na tradução: {e}")
+            return None
+
+    def _traduzir_lote(self, lote):
+        if len(lote) > 1:
+            try:
+                partes = _SPLIT.split(self._translator.translate(SEPARADOR.join(lote)) or "")
+                if len(partes) == len(lote):
+                    return partes
+            except Exception as e:
+                print(f"⚠️ Falha no lote de tradução ({len(lote)} textos): {e}")
+            # separador perdido ou erro: traduz um a um
+        return [self._traduzir_um(t) for t in lote]
+
+    def _executar(self, textos):
+        traduzidos = {}
+        for lote in self._lotes(textos):
+            for texto, traducao in zip(lote, self._traduzir_lote(lote)):
+                if traducao is not None:
+                    traduzidos[self._chave(texto)] = traducao
+        if traduzidos:
+            self.cache.put_many(traduzidos)
+        return traduzidos
+
+    # --------------------------------------------------
+    def prefetch(self, textos):
+        """Enfileira os textos ainda sem tradução em cache; não bloqueia."""
+        novos = {}
+        with self._lock:
+            for texto in textos:
+                if not texto:
+                    continue
+                chave = self._chave(texto)
+                if chave in self._pendentes or chave in novos or self.cache.get(chave) is not None:
+                    continue
+                novos[chave] = texto
+
+            if novos:
+                future = self._executor.submit(self._executar, list(novos.values()))
+                for chave in novos:
+                    self._pendentes[chave] = future
+
+    def traduzir(self, texto):
+        """Tradução de `texto` (espera o lote em andamento, se houver). Falha → ""."""
+        if not texto:
+            return ""
+
+        chave = self._chave(texto)
+        traducao = self.cache.get(chave)
+        if traducao is not None:
+            return traducao
+
+        self.prefetch([texto])
+        with self._lock:
+            future = self._pendentes.get(chave)
+        if future is None:
+            # lote concluído entre a consulta ao cache e o prefetch
+            return self.cache.get(chave) or ""
+
+        traducao = future.result().get(chave)
+        with self._lock:
+            self._pendentes.pop(chave, None)
+        return traducao or ""
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -4,20 +4,27 @@
 import json
 import time
 import re
+import asyncio
 from pathlib import Path
-from difflib import get_close_matches
-from deep_translator import GoogleTranslator
 
 from sites.goyabu.anime_list import GoyabuAnimeListScraper
 from sites.goyabu.anime_page import GoyabuAnimePageScraper
 from sites.goyabu.episode_page import GoyabuEpisodePageScraper
 from sites.goyabu.AniList.anilist_api import (
     buscar_detalhes_anime_por_titulo,
-    buscar_titulos_disponiveis,
+    buscar_detalhes_animes_em_lote,
+    buscar_detalhes_anime_por_url,
+    buscar_detalhes_animes_por_urls,
+    associar_url,
     buscar_detalhes_anime
 )
+from sites.goyabu.AniList.client import get_anilist_client
 
-from core.error_logger import log_error
+from core.error_logger import get_error_store, log_error
+from core.async_fetcher import AsyncFetcher
+from core.storage import JsonlJournal
+from core.checkpoint import Checkpoint
+from core.translation import DescriptionTranslator
 
 # --------------------------------------------------
 # OUTPUT
@@ -25,6 +32,8 @@ from core.error_logger import log_error
 OUTPUT_DIR = Path("output")
 OUTPUT_DIR.mkdir(exist_ok=True)
 OUTPUT_FILE = OUTPUT_DIR / "animes.json"
+JOURNAL_FILE = OUTPUT_DIR / "animes.jsonl"   # um anime por linha até a compactação
+CHECKPOINT_FILE = OUTPUT_DIR / "checkpoint.json"
 
 # --------------------------------------------------
 # ERROS
@@ -54,25 +63,13 @@ def registrar_erro(tipo, anime=None, url=None, erro=None, extra=None):
 # --------------------------------------------------
 # 🔧 AJUSTE IA — DASHBOARD HELPERS
 # --------------------------------------------------
-def carregar_dashboard():
-    if not DASHBOARD_FILE.exists():
-        return {}
-    return json.loads(DASHBOARD_FILE.read_text(encoding="utf-8"))
-
+# O dashboard é carregado uma vez por execução (core.error_logger.ErrorStore):
+# títulos mapeados saem da memória e os "fixed" são gravados em lote.
 def marcar_erro_corrigido(url):
-    dashboard = carregar_dashboard()
-    for e in dashboard.get("errors", []):
-        if e.get("url") == url and not e.get("fixed"):
-            e["fixed"] = True
-            e["pending_retry"] = False
-    DASHBOARD_FILE.write_text(json.dumps(dashboard, indent=2, ensure_ascii=False), encoding="utf-8")
+    get_error_store().mark_fixed(url)
 
 def obter_mapped_title(url):
-    dashboard = carregar_dashboard()
-    for e in dashboard.get("errors", []):
-        if e.get("url") == url and e.get("mapped_title"):
-            return e.get("mapped_title")
-    return None
+    return get_error_store().mapped_title(url)
 
 # --------------------------------------------------
 # NORMALIZAÇÃO DE TÍTULOS
@@ -89,9 +86,19 @@ def normalizar_titulo(titulo):
 # --------------------------------------------------
 # CONTROLE DE QUALIDADE
 # --------------------------------------------------
+EM_EXIBICAO = {"RELEASING", "NOT_YET_RELEASED"}  # status que ainda mudam no AniList
+
 def anime_esta_completo(anime: dict) -> bool:
     return bool(anime.get("episodios"))
 
+def metadados_completos(anime: dict) -> bool:
+    """Registro salvo com dados reais do AniList (e descrição já traduzida, se houver)."""
+    return bool(
+        anime.get("títulos")
+        and anime.get("status")
+        and (anime.get("descricoes_pt") or not anime.get("descricoes"))
+    )
+
 def carregar_existentes():
     if OUTPUT_FILE.exists():
         try:
@@ -101,6 +108,18 @@ def carregar_existentes():
             return []
     return []
 
+def id_episodio(url):
+    """ID do episódio no Goyabu (último segmento da URL)."""
+    return (url or "").rstrip("/").rsplit("/", 1)[-1]
+
+def episodios_conhecidos(anime: dict) -> set:
+    """IDs de episódios já salvos com streams; os sem stream são refeitos."""
+    return {
+        id_episodio(e.get("url"))
+        for e in anime.get("episodios", [])
+        if e.get("url") and e.get("streams")
+    }
+
 # --------------------------------------------------
 # FUNÇÃO HELPER PARA SERIALIZAÇÃO
 # --------------------------------------------------
@@ -117,130 +136,563 @@ def serialize_obj(obj):
 # --------------------------------------------------
 # BUSCA ANILIST (COM IA TITLE MAPPING)
 # --------------------------------------------------
-def buscar_anime_por_url_ou_fuzzy(titulo, url=None):
+def preparar_busca(titulo, url=None):
+    """
+    Retorna (titulo, termo de busca no AniList); o termo é None
+    quando o título normalizado fica vazio. O fuzzy match contra os
+    títulos reais do AniList acontece no índice local (title_index).
+    """
     # 🔧 AJUSTE IA — usa título mapeado se existir
     mapped = obter_mapped_title(url)
     if mapped:
         titulo = mapped
 
     titulo_norm = normalizar_titulo(titulo)
-    try:
-        possiveis = buscar_titulos_disponiveis(titulo_norm[:50])
-        if possiveis:
-            match = get_close_matches(titulo_norm, possiveis, n=1, cutoff=0.6)
-            if match:
-                ani_data = buscar_detalhes_anime_por_titulo(match[0])
-                if ani_data:
-                    ani_data.thumbnail = ani_data.coverImage if hasattr(ani_data, "coverImage") else ""
-                    ani_data.fanart = ani_data.bannerImage or ani_data.coverImage or ""
-                    return ani_data
-    except Exception as e:
-        registrar_erro("ANILIST_FALHA", titulo, url, str(e))
-        log_error(anime=titulo, url=url, stage="anilist", error_type="ANILIST_FALHA", message=str(e))
+    return titulo, titulo_norm or None
+
+def _com_imagens(ani_data):
+    ani_data.thumbnail = ani_data.coverImage if hasattr(ani_data, "coverImage") else ""
+    ani_data.fanart = ani_data.bannerImage or ani_data.coverImage or ""
+    return ani_data
 
+def _registrar_nao_encontrado(titulo, url):
     registrar_erro("ANIME_NAO_ENCONTRADO", titulo, url)
     log_error(anime=titulo, url=url, stage="anilist", error_type="ANIME_NAO_ENCONTRADO", message="Anime não encontrado no AniList")
+
+def _registrar_falha_anilist(titulo, url, e):
+    registrar_erro("ANILIST_FALHA", titulo, url, str(e))
+    log_error(anime=titulo, url=url, stage="anilist", error_type="ANILIST_FALHA", message=str(e))
+
+def _anime_por_url(url):
+    """Anime já associado à URL no cache (a menos que a IA tenha mapeado outro título)."""
+    if not url or obter_mapped_title(url):
+        return None
+    return buscar_detalhes_anime_por_url(url)
+
+def buscar_anime_por_url_ou_fuzzy(titulo, url=None):
+    try:
+        ani_data = _anime_por_url(url)
+        if ani_data:
+            return _com_imagens(ani_data)
+
+        titulo, busca = preparar_busca(titulo, url)
+        if busca:
+            ani_data = buscar_detalhes_anime_por_titulo(busca)
+            if ani_data:
+                if url:
+                    associar_url(url, ani_data.id)
+                return _com_imagens(ani_data)
+    except Exception as e:
+        _registrar_falha_anilist(titulo, url, e)
+
+    _registrar_nao_encontrado(titulo, url)
     return None
 
+def buscar_animes_em_lote(animes):
+    """
+    Resolve no AniList todos os animes de uma página da lista de uma vez.
+    Retorna {link: Anime | None}.
+    """
+    resultado = {}
+    buscas = {}
+
+    # animes já associados por URL: payloads vencidos são renovados num lote por ID
+    mapeados = buscar_detalhes_animes_por_urls(
+        [a["link"] for a in animes if a["link"] and not obter_mapped_title(a["link"])]
+    )
+
+    for anime in animes:
+        ani_data = mapeados.get(anime["link"])
+        if ani_data:
+            resultado[anime["link"]] = _com_imagens(ani_data)
+        else:
+            buscas[anime["link"]] = preparar_busca(anime["titulo"], anime["link"])
+
+    try:
+        encontrados = buscar_detalhes_animes_em_lote([b for _, b in buscas.values() if b])
+    except Exception as e:
+        encontrados = {}
+        for link, (titulo, _) in buscas.items():
+            _registrar_falha_anilist(titulo, link, e)
+
+    for link, (titulo, busca) in buscas.items():
+        ani_data = encontrados.get(busca) if busca else None
+        if ani_data:
+            associar_url(link, ani_data.id)
+            resultado[link] = _com_imagens(ani_data)
+        else:
+            _registrar_nao_encontrado(titulo, link)
+            resultado[link] = None
+    return resultado
+
 # --------------------------------------------------
-# FUNÇÃO PRINCIPAL
+# MONTAGEM DO REGISTRO
 # --------------------------------------------------
-def main(max_pages=None, delay=1.5):
-    anime_list_scraper = GoyabuAnimeListScraper()
-    anime_page_scraper = GoyabuAnimePageScraper()
-    episode_page_scraper = GoyabuEpisodePageScraper()
+def montar_anime_obj(anime, ani_data):
+    ani_dict = ani_data.__dict__ if ani_data else {}
+
+    return {
+        "nome": anime["titulo"],
+        "tipo": "Legendado",
+        "nota": ani_dict.get("averageScore", ""),
+        "url": anime["link"],
+        "episodios": [],
+        "títulos": ani_dict.get("titles", {}),
+        "descricoes": ani_dict.get("description", ""),
+        "descricoes_pt": "",  # preenchido pelo DescriptionTranslator antes de gravar
+        "generos": ani_dict.get("genres", []),
+        "episodes_total": ani_dict.get("episodes", 0),
+        "duration": ani_dict.get("duration", 0),
+        "status": ani_dict.get("status", ""),
+        "averageScore": ani_dict.get("averageScore", 0),
+        "popularity": ani_dict.get("popularity", 0),
+        "favourites": ani_dict.get("favourites", 0),
+        "studios": ani_dict.get("studios", []),
+        "staff": serialize_obj(ani_dict.get("staff", [])),
+        "characters": serialize_obj(ani_dict.get("characters", [])),
+        "relations": serialize_obj(ani_dict.get("relations", [])),
+        "trailer": serialize_obj(ani_dict.get("trailer", {})),
+        "externalLinks": serialize_obj(ani_dict.get("externalLinks", [])),
+        "thumbnail": ani_dict.get("thumbnail", ""),
+        "fanart": ani_dict.get("fanart", "")
+    }
 
-    existentes = carregar_existentes()
-    existentes_por_url = {a["url"]: a for a in existentes if "url" in a}
+# --------------------------------------------------
+# COLETA CONCORRENTE DE EPISÓDIOS
+# --------------------------------------------------
+async def coletar_streams(episode_page_scraper, episodios, ao_concluir=None):
+    """
+    Dispara obter_streams_async para todos os episódios de uma vez;
+    o AsyncFetcher limita quantos ficam em voo por host.
+    ao_concluir(ep, streams) é chamado assim que cada episódio termina.
+    """
+    async def _um(ep):
+        streams = await episode_page_scraper.obter_streams_async(ep["link"])
+        if ao_concluir:
+            ao_concluir(ep, streams)
+        return streams
+
+    return await asyncio.gather(*(_um(ep) for ep in episodios))
 
-    resultado_final = []
-    fila_retry = []
-    pagina = 1
+# --------------------------------------------------
+# CRAWLER (PIPELINE)
+# --------------------------------------------------
+FIM = object()  # sentinela de fim de estágio
+
+
+class GoyabuCrawler:
+    """
+    Pipeline produtor/consumidor com filas limitadas:
+    lista → AniList → episódios → streams → gravação.
+    Cada estágio tem seus workers; uma fila cheia só segura o estágio
+    anterior, então um AniList ou tradutor lento não para o scraping.
+    Cada anime concluído vai para o journal e o progresso para o checkpoint.
+    """
+
+    CHECKPOINT_A_CADA = 20  # episódios entre saves do checkpoint
+    TAMANHO_FILA = 8
+    WORKERS = {
+        "anilist": 1,    # chamadas síncronas e com rate limit, em thread
+        "episodios": 4,
+        "streams": 2,    # cada um já dispara todos os episódios do anime
+    }
+
+    def __init__(self, loop, async_fetcher, journal, checkpoint, tradutor, incremental=False, tempo_maximo=None):
+        self.loop = loop
+        self.journal = journal
+        self.checkpoint = checkpoint
+        self.tradutor = tradutor
+        self.incremental = incremental
+        self.tempo_maximo = tempo_maximo
+        self.inicio = time.monotonic()
+        self.interrompido = False
+        self.listagem_incompleta = False
+
+        self.anime_list_scraper = GoyabuAnimeListScraper(async_fetcher=async_fetcher)
+        self.anime_page_scraper = GoyabuAnimePageScraper(async_fetcher=async_fetcher)
+        self.episode_page_scraper = GoyabuEpisodePageScraper(async_fetcher=async_fetcher)
+
+        existentes = carregar_existentes()
+        self.existentes_por_url = {a["url"]: a for a in existentes if "url" in a}
+
+        # Animes já gravados por uma execução anterior interrompida
+        self.concluidos = {r["url"] for r in journal.read() if "url" in r} | checkpoint.animes
+
+        # Links ainda em voo por página; a página só conta como concluída
+        # no checkpoint quando ela e todas as anteriores esvaziam
+        self.paginas_pendentes = {}
+
+    def _tempo_esgotado(self):
+        if self.tempo_maximo is not None and time.monotonic() - self.inicio > self.tempo_maximo:
+            self.interrompido = True
+        return self.interrompido
+
+    # --------------------------------------------------
+    def executar(self, max_pages=None, delay=1.5):
+        """Retorna True se o crawl terminou, False se parou por tempo."""
+        pagina = self.checkpoint.ultima_pagina + 1
+
+        print("🚀 Iniciando scraper híbrido Goyabu + AniList\n")
+        if pagina > 1 or self.concluidos:
+            print(f"♻️ Retomando da página {pagina} — {len(self.concluidos)} animes já processados")
+
+        self.loop.run_until_complete(self._pipeline(self._paginas(pagina, max_pages, delay)))
+        if self.interrompido or self.listagem_incompleta:
+            return self._interromper()
+
+        if not self.processar_fila_retry():
+            return self._interromper()
+
+        return True
+
+    def _interromper(self):
+        self.journal.sync()
+        self.checkpoint.save()
+        motivo = "Tempo esgotado" if self.interrompido else "Listagem interrompida"
+        print(f"\n⏸️ {motivo} — progresso salvo no checkpoint")
+        return False
+
+    def processar_fila_retry(self):
+        """Última tentativa para os animes que falharam (desta ou de execuções anteriores)."""
+        fila = list(self.checkpoint.fila_retry)
+        if fila:
+            print(f"\n🔁 Reprocessando fila de retry — {len(fila)} animes")
+
+            async def _fonte():
+                yield None, fila, True
+
+            self.loop.run_until_complete(self._pipeline(_fonte()))
+
+        self.journal.sync()
+        return not self.interrompido
+
+    # --------------------------------------------------
+    # PIPELINE
+    # --------------------------------------------------
+    async def _pipeline(self, fonte):
+        w = self.WORKERS
+        anilist, episodios, streams, escrita = (asyncio.Queue(self.TAMANHO_FILA) for _ in range(4))
+
+        await asyncio.gather(
+            self._produzir(fonte, anilist, w["anilist"]),
+            self._estagio(self._enriquecer, anilist, episodios, w["anilist"], w["episodios"]),
+            self._estagio(self._descobrir_episodios, episodios, streams, w["episodios"], w["streams"]),
+            self._estagio(self._extrair_streams, streams, escrita, w["streams"], 1),
+            self._estagio(self._gravar, escrita, None, 1, 0, descartavel=False),
+        )
+        self.journal.sync()
+
+    async def _produzir(self, fonte, saida, consumidores):
+        try:
+            async for item in fonte:
+                if self._tempo_esgotado():
+                    break
+                await saida.put(item)
+        except Exception as e:
+            # para de produzir; os estágios terminam o que já está em voo
+            # e o resume continua da última página concluída
+            print(f"❌ Erro na listagem: {e}")
+            self.listagem_incompleta = True
+        finally:
+            await fonte.aclose()
+            for _ in range(consumidores):
+                await saida.put(FIM)
+
+    async def _estagio(self, fn, entrada, saida, workers, consumidores, descartavel=True):
+        """
+        Roda `workers` cópias de fn(item) → itens para `saida`.
+        Com o tempo esgotado, estágios descartáveis só drenam a fila
+        (o trabalho descartado é refeito ao retomar).
+        """
+        async def _worker():
+            while True:
+                item = await entrada.get()
+                if item is FIM:
+                    return
+                if descartavel and self._tempo_esgotado():
+                    continue
+                try:
+                    resultados = await fn(item)
+                except Exception as e:
+                    print(f"❌ Erro no estágio {fn.__name__}: {e}")
+                    self._falha_no_estagio(item, e)
+                    continue
+                if saida is not None:
+                    for r in resultados:
+                        await saida.put(r)
 
-    print("🚀 Iniciando scraper híbrido Goyabu + AniList\n")
+        try:
+            await asyncio.gather(*(_worker() for _ in range(workers)))
+        finally:
+            if saida is not None:
+                for _ in range(consumidores):
+                    await saida.put(FIM)
+
+    # --------------------------------------------------
+    # 1) DESCOBERTA (LISTA DE ANIMES)
+    # --------------------------------------------------
+    async def _paginas(self, pagina, max_pages, delay):
+        while not (max_pages and pagina > max_pages):
+            print(f"📄 Coletando Página {pagina}")
+            animes = await self.anime_list_scraper.listar_async(pagina)
+            if not animes:
+                break
+
+            pendentes = [a for a in animes if a["link"] not in self.concluidos]
+            self.paginas_pendentes[pagina] = {a["link"] for a in pendentes}
+            self._concluir_paginas()
+            if pendentes:
+                yield pagina, pendentes, False
+
+            pagina += 1
+            await asyncio.sleep(delay)
+
+    def _liberar(self, pagina, link):
+        """O anime saiu da página (gravado ou na fila de retry)."""
+        if pagina is not None:
+            self.paginas_pendentes.get(pagina, set()).discard(link)
+            self._concluir_paginas()
+
+    def _concluir_paginas(self):
+        while not self.paginas_pendentes.get(self.checkpoint.ultima_pagina + 1, True):
+            pagina = self.checkpoint.ultima_pagina + 1
+            del self.paginas_pendentes[pagina]
+            self.journal.sync()
+            self.checkpoint.concluir_pagina(pagina)
+
+    # --------------------------------------------------
+    # 2) ANILIST
+    # --------------------------------------------------
+    def _reaproveitar(self, link):
+        """
+        Modo incremental: reaproveita os metadados salvos sem AniList/tradução,
+        a menos que estejam vazios, a IA tenha mapeado outro título ou o
+        anime ainda esteja em exibição (status muda).
+        """
+        antigo = self.existentes_por_url.get(link)
+        return bool(
+            self.incremental
+            and antigo
+            and metadados_completos(antigo)
+            and antigo.get("status") not in EM_EXIBICAO
+            and not obter_mapped_title(link)
+        )
+
+    def enriquecer_pagina(self, animes):
+        """Resolve no AniList juntos todos os títulos da página; retorna {link: Anime | None}."""
+        pendentes = [a for a in animes if not self._reaproveitar(a["link"])]
+        if not pendentes:
+            return {}
+
+        print(f"🔎 AniList: resolvendo {len(pendentes)} títulos em lote")
+        resolvidos = buscar_animes_em_lote(pendentes)
+
+        # traduz as descrições da página enquanto os episódios são coletados
+        self.tradutor.prefetch(a.description for a in resolvidos.values() if a)
+        return resolvidos
+
+    async def _enriquecer(self, item):
+        pagina, animes, retry = item
+        resolvidos = await asyncio.to_thread(self.enriquecer_pagina, animes)
+
+        jobs = []
+        for anime in animes:
+            if retry:
+                # sai da fila de retry só quando for gravado (_gravar)
+                self.concluidos.discard(anime["link"])
+
+            antigo = self.existentes_por_url.get(anime["link"])
+            job = {"anime": anime, "pagina": pagina, "antigo": antigo, "traduzir": False}
+
+            if self._reaproveitar(anime["link"]):
+                # Anime já conhecido e estável: reaproveita metadados
+                anime_obj = dict(antigo)
+            else:
+                if anime["link"] in resolvidos:
+                    ani_data = resolvidos[anime["link"]]
+                else:
+                    ani_data = await asyncio.to_thread(buscar_anime_por_url_ou_fuzzy, anime["titulo"], anime["link"])
+
+                if ani_data is None and self.incremental and antigo:
+                    # AniList não resolveu: não troca o que já tinha por campos vazios
+                    anime_obj = dict(antigo)
+                else:
+                    anime_obj = montar_anime_obj(anime, ani_data)
+
+            if self.incremental and antigo:
+                anime_obj["episodios"] = list(antigo.get("episodios", []))
+
+            # traduz descrições novas e as que falharam numa execução anterior
+            job["traduzir"] = bool(anime_obj.get("descricoes") and not anime_obj.get("descricoes_pt"))
+            if job["traduzir"]:
+                self.tradutor.prefetch([anime_obj["descricoes"]])
+
+            job["anime_obj"] = anime_obj
+            jobs.append(job)
+        return jobs
+
+    # --------------------------------------------------
+    # 3) EPISÓDIOS
+    # --------------------------------------------------
+    async def _descobrir_episodios(self, job):
+        anime, anime_obj = job["anime"], job["anime_obj"]
+        print(f"\n🎬 {anime['titulo']}")
 
-    while True:
-        if max_pages and pagina > max_pages:
-            break
+        try:
+            episodios = await self.anime_page_scraper.listar_episodios_async(anime["link"])
+
+            if self.incremental:
+                # Só busca streams de episódios que ainda não temos
+                conhecidos = episodios_conhecidos(anime_obj)
+                anime_obj["episodios"] = [
+                    e for e in anime_obj["episodios"] if id_episodio(e.get("url")) in conhecidos
+                ]
+                episodios = [ep for ep in episodios if id_episodio(ep["link"]) not in conhecidos]
+                if episodios:
+                    print(f"🆕 {len(episodios)} episódio(s) novo(s)")
+
+            # Episódios resolvidos antes de uma interrupção
+            parciais = self.checkpoint.episodios_de(anime["link"])
+            anime_obj["episodios"].extend(
+                parciais[id_episodio(ep["link"])] for ep in episodios if id_episodio(ep["link"]) in parciais
+            )
+            job["episodios"] = [ep for ep in episodios if id_episodio(ep["link"]) not in parciais]
+        except Exception as e:
+            self._agendar_retry(job, e)
+
+        return [job]
+
+    # --------------------------------------------------
+    # 4) STREAMS
+    # --------------------------------------------------
+    async def _extrair_streams(self, job):
+        if job.get("falhou"):
+            return [job]
+
+        anime, anime_obj = job["anime"], job["anime_obj"]
+        try:
+            await coletar_streams(
+                self.episode_page_scraper,
+                job["episodios"],
+                lambda ep, streams: self._episodio_concluido(anime, anime_obj, ep, streams)
+            )
+
+            anime_obj["episodios"].sort(key=lambda e: e.get("episodio") or 0)
+
+            # 🔧 AJUSTE IA — marca erro resolvido
+            marcar_erro_corrigido(anime["link"])
+
+        except Exception as e:
+            self._agendar_retry(job, e)
+
+        return [job]
+
+    def _falha_no_estagio(self, item, e):
+        """Exceção não tratada num estágio: o(s) anime(s) do item vão para a fila de retry."""
+        if isinstance(item, dict):
+            self._agendar_retry(item, e)
+            self._liberar(item.get("pagina"), item["anime"]["link"])
+        else:
+            pagina, animes, _ = item
+            for anime in animes:
+                self._agendar_retry({"anime": anime}, e)
+                self._liberar(pagina, anime["link"])
+
+    def _agendar_retry(self, job, e):
+        anime = job["anime"]
+        job["falhou"] = True
+        self.checkpoint.agendar_retry(anime)
+        registrar_erro("RETRY_AGENDADO", anime["titulo"], anime["link"], str(e))
+        log_error(anime=anime["titulo"], url=anime["link"], stage="retry_queue", error_type="RETRY_AGENDADO", message="Agendado para retry")
+
+    def _episodio_concluido(self, anime, anime_obj, ep, streams):
+        entry = {
+            "episodio": ep["numero"],
+            "url": ep["link"],
+            "streams": streams
+        }
+        anime_obj["episodios"].append(entry)
+        self.checkpoint.marcar_episodio(anime["link"], id_episodio(ep["link"]), entry)
+
+        if len(anime_obj["episodios"]) % self.CHECKPOINT_A_CADA == 0:
+            self.checkpoint.save()
+
+    # --------------------------------------------------
+    # 5) GRAVAÇÃO
+    # --------------------------------------------------
+    async def _gravar(self, job):
+        anime, anime_obj, antigo = job["anime"], job["anime_obj"], job["antigo"]
+
+        if job["traduzir"]:
+            # só espera se o lote de tradução ainda não terminou
+            anime_obj["descricoes_pt"] = await asyncio.to_thread(self.tradutor.traduzir, anime_obj["descricoes"])
+
+        if self.incremental:
+            self.journal.append(anime_obj)
+        else:
+            self.journal.append(antigo if antigo and anime_esta_completo(antigo) else anime_obj)
+
+        self.concluidos.add(anime["link"])
+        self.checkpoint.concluir_anime(anime["link"])
+        if not job.get("falhou"):
+            self.checkpoint.remover_retry(anime["link"])
+
+        self._liberar(job["pagina"], anime["link"])
+        return ()
 
-        print(f"📄 Coletando Página {pagina}")
-        animes = anime_list_scraper.listar(pagina)
-        if not animes:
-            break
+# --------------------------------------------------
+# FUNÇÃO PRINCIPAL
+# --------------------------------------------------
+def main(max_pages=None, delay=1.5, concorrencia=8, incremental=False, resume=False, tempo_maximo=None):
+    """
+    resume=True continua do checkpoint/journal da última execução;
+    tempo_maximo (segundos) encerra com checkpoint antes do limite do CI.
+    """
+    journal = JsonlJournal(JOURNAL_FILE)
+
+    if resume:
+        checkpoint = Checkpoint.load(CHECKPOINT_FILE)
+    else:
+        # Execução nova: descarta progresso anterior, mas não a fila de retry
+        checkpoint = Checkpoint(CHECKPOINT_FILE)
+        checkpoint.fila_retry = Checkpoint.load(CHECKPOINT_FILE).fila_retry
+        journal.discard()
 
-        for anime in animes:
-            print(f"\n🎬 {anime['titulo']}")
-
-            ani_data = buscar_anime_por_url_ou_fuzzy(anime["titulo"], anime["link"])
-            ani_dict = ani_data.__dict__ if ani_data else {}
-
-            anime_obj = {
-                "nome": anime["titulo"],
-                "tipo": "Legendado",
-                "nota": ani_dict.get("averageScore", ""),
-                "url": anime["link"],
-                "episodios": [],
-                "títulos": ani_dict.get("titles", {}),
-                "descricoes": ani_dict.get("description", ""),
-                "descricoes_pt": GoogleTranslator(source='en', target='pt').translate(ani_dict.get("description", "")) if ani_data else "",
-                "generos": ani_dict.get("genres", []),
-                "episodes_total": ani_dict.get("episodes", 0),
-                "duration": ani_dict.get("duration", 0),
-                "status": ani_dict.get("status", ""),
-                "averageScore": ani_dict.get("averageScore", 0),
-                "popularity": ani_dict.get("popularity", 0),
-                "favourites": ani_dict.get("favourites", 0),
-                "studios": ani_dict.get("studios", []),
-                "staff": serialize_obj(ani_dict.get("staff", [])),
-                "characters": serialize_obj(ani_dict.get("characters", [])),
-                "relations": serialize_obj(ani_dict.get("relations", [])),
-                "trailer": serialize_obj(ani_dict.get("trailer", {})),
-                "externalLinks": serialize_obj(ani_dict.get("externalLinks", [])),
-                "thumbnail": ani_dict.get("thumbnail", ""),
-                "fanart": ani_dict.get("fanart", "")
-            }
-
-            try:
-                episodios = anime_page_scraper.listar_episodios(anime["link"])
-                for ep in episodios:
-                    streams = episode_page_scraper.obter_streams(ep["link"])
-                    anime_obj["episodios"].append({
-                        "episodio": ep["numero"],
-                        "url": ep["link"],
-                        "streams": streams
-                    })
-
-                # 🔧 AJUSTE IA — marca erro resolvido
-                marcar_erro_corrigido(anime["link"])
-
-            except Exception as e:
-                fila_retry.append(anime)
-                registrar_erro("RETRY_AGENDADO", anime["titulo"], anime["link"], str(e))
-                log_error(anime=anime["titulo"], url=anime["link"], stage="retry_queue", error_type="RETRY_AGENDADO", message="Agendado para retry")
-
-            antigo = existentes_por_url.get(anime["link"])
-            resultado_final.append(antigo if antigo and anime_esta_completo(antigo) else anime_obj)
-
-        salvar_parcial(resultado_final)
-        pagina += 1
-        time.sleep(delay)
-
-    salvar_final(resultado_final)
-    print("\n🌟 Scraping finalizado")
+    # Um único loop e um único pool de conexões para toda a execução
+    loop = asyncio.new_event_loop()
+    async_fetcher = AsyncFetcher(per_host=concorrencia)
+    tradutor = DescriptionTranslator(source="en", target="pt")
+    dashboard = get_error_store()
+
+    try:
+        crawler = GoyabuCrawler(loop, async_fetcher, journal, checkpoint, tradutor, incremental, tempo_maximo)
+        if crawler.executar(max_pages, delay):
+            # Zera o checkpoint antes de compactar: se o processo morrer entre
+            # os dois, o resume refaz o crawl com o journal intacto em vez de
+            # ver tudo concluído com o journal já descartado
+            checkpoint.reiniciar()
+            salvar_final(journal)
+            print("\n🌟 Scraping finalizado")
+    finally:
+        print(get_anilist_client().resumo())
+        # Em caso de falha o journal fica no disco para a próxima execução
+        journal.close()
+        checkpoint.save()
+        tradutor.close()
+        dashboard.snapshot()
+        loop.run_until_complete(async_fetcher.aclose())
+        loop.close()
 
 # --------------------------------------------------
 # SALVAMENTO
 # --------------------------------------------------
-def salvar_parcial(data):
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-def salvar_final(data):
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def salvar_final(journal):
+    """Compacta animes.json + journal (o journal vence por url) com troca atômica."""
+    data = journal.compact(OUTPUT_FILE, base=carregar_existentes())
+    print(f"💾 {len(data)} animes salvos em {OUTPUT_FILE}")
 
 # --------------------------------------------------
 # ENTRYPOINT
 # --------------------------------------------------
 if __name__ == "__main__":
-    main(max_pages=1)
\ No newline at end of file
+    main(max_pages=1, incremental=True, resume=True, tempo_maximo=100 * 60)
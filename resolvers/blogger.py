@@ -1,8 +1,8 @@
 # resolvers/blogger.py
 import re
-from bs4 import BeautifulSoup
 
 from core.fetcher import Fetcher
+from core.parser import parse_html
 from resolvers.base import BaseResolver
 from resolvers.googlevideo import GoogleVideoResolver
 
@@ -25,8 +25,8 @@ class BloggerResolver(BaseResolver):
             return sources
 
         # 2ï¸â£ fallback: iframe
-        soup = BeautifulSoup(html, "html.parser")
-        iframe = soup.find("iframe")
+        soup = parse_html(html)
+        iframe = soup.select_one("iframe")
         if iframe and iframe.get("src"):
             return self._resolve_iframe(iframe["src"])
 
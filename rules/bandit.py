@@ -0,0 +1,123 @@
+# rules/bandit.py
+import math
+import time
+from collections import deque
+
+from core.error_logger import log_error
+from core.fingerprint import get_fingerprint_store, page_fingerprint
+
+JANELA = 50       # últimos resultados considerados por strategy
+EXPLORACAO = 0.5  # peso do bônus de exploração do UCB
+
+
+class StrategyStats:
+    """Taxa de sucesso (janela deslizante) e custo médio de uma strategy."""
+
+    def __init__(self, window=(), cost_ms=0.0, pulls=0):
+        self.window = deque(window, maxlen=JANELA)
+        self.cost_ms = cost_ms
+        self.pulls = pulls
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        return cls(data.get("window", ()), data.get("cost_ms", 0.0), data.get("pulls", 0))
+
+    def to_dict(self):
+        return {"window": list(self.window), "cost_ms": round(self.cost_ms, 3), "pulls": self.pulls}
+
+    @property
+    def taxa(self):
+        return sum(self.window) / len(self.window) if self.window else 0.0
+
+    def registrar(self, sucesso, custo_ms):
+        self.window.append(1 if sucesso else 0)
+        # média móvel exponencial: acompanha mudanças de layout/HTML
+        self.cost_ms = custo_ms if not self.pulls else 0.8 * self.cost_ms + 0.2 * custo_ms
+        self.pulls += 1
+
+
+def ucb(stats, total):
+    """UCB1 sobre a janela; strategy nunca testada vem primeiro."""
+    n = len(stats.window)
+    if n == 0:
+        return math.inf
+    return stats.taxa + EXPLORACAO * math.sqrt(math.log(max(total, 1)) / n)
+
+
+def ordenar(strategies, stats):
+    """Strategies compiladas na ordem do UCB (empate: a mais barata)."""
+    vazio = StrategyStats()
+    total = sum(len(stats.get(s.name, vazio).window) for s in strategies)
+
+    def _chave(strat):
+        st = stats.get(strat.name, vazio)
+        return -ucb(st, total), st.cost_ms
+
+    return sorted(strategies, key=_chave)
+
+
+# --------------------------------------------------
+# EXECUÇÃO
+# --------------------------------------------------
+def _medir(aplicar, strat):
+    inicio = time.perf_counter()
+    resultado = aplicar(strat)
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+def _reportar_layout_novo(contexto, fp, url):
+    print(f"⚠️ Estrutura nova em {contexto} (fingerprint {fp})")
+    log_error(
+        anime=None,
+        url=url,
+        stage=contexto,
+        error_type="STRUCTURE_CHANGED",
+        message=f"Layout com fingerprint {fp} nunca visto em {contexto}"
+    )
+
+
+def run_strategies(loader, filename, kind, aplicar, html=None, url=None):
+    """
+    Roda as strategies de `kind` na ordem do bandit até uma dar resultado,
+    registrando sucesso/custo de cada tentativa no rule file.
+    Com `html`, o fingerprint estrutural da página leva direto à strategy
+    que venceu da última vez nesse layout (ou no contexto, se o layout é
+    novo). Layout novo só é reportado, com a `url` da página, quando essa
+    strategy falha nele.
+    """
+    candidatas = [s for s in loader.get_ordered(filename) if s.kind == kind]
+
+    contexto = f"{filename.rsplit('.', 1)[0]}:{kind}"
+    fp = page_fingerprint(html) if html else None
+    store = get_fingerprint_store() if fp else None
+
+    def _venceu(strat, resultado):
+        if fp:
+            store.remember(contexto, fp, strat.name)
+        return resultado
+
+    if fp:
+        preferida, _ = store.lookup(contexto, fp)
+        strat = next((s for s in candidatas if s.name == preferida), None)
+        if strat:
+            resultado, custo = _medir(aplicar, strat)
+            loader.record(filename, strat.name, bool(resultado), custo)
+            if resultado:
+                # mesmo num layout novo: se a strategy de sempre extrai, nada mudou
+                return resultado
+            candidatas.remove(strat)
+
+        if store.is_new_layout(contexto, fp):
+            _reportar_layout_novo(contexto, fp, url)
+
+    for strat in candidatas:
+        resultado, custo = _medir(aplicar, strat)
+        loader.record(filename, strat.name, bool(resultado), custo)
+        if resultado:
+            return _venceu(strat, resultado)
+
+    if fp:
+        # layout já reportado; sem vencedor, volta à cascata completa
+        store.remember(contexto, fp, None)
+    return []
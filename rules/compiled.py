@@ -0,0 +1,117 @@
+# rules/compiled.py
+import re
+from abc import ABC, abstractmethod
+
+
+class CompiledStrategy(ABC):
+    """
+    Strategy de rules/*.json já preparada para execução: seletores,
+    regex compiladas e plano de extração de campos resolvidos uma vez.
+    extract(doc, html) devolve a lista bruta de resultados da strategy.
+    """
+
+    kind = None
+    needs_dom = True
+
+    def __init__(self, strat):
+        self.name = strat.get("name")
+        self.score = strat.get("score", 0)
+        self.selector = strat.get("selector")
+
+    @property
+    def valid(self):
+        return bool(self.selector)
+
+    @abstractmethod
+    def extract(self, doc, html=None):
+        ...
+
+
+class CardStrategy(CompiledStrategy):
+    """selector + fields: um item por elemento, cada campo por sub-seletor."""
+
+    kind = "card"
+
+    def __init__(self, strat):
+        super().__init__(strat)
+        # plano: (campo, seletor, attr ou None para texto)
+        self.plan = []
+        for name, rule in (strat.get("fields") or {}).items():
+            kind = rule.get("type")
+            if kind == "text":
+                self.plan.append((name, rule.get("selector"), None))
+            elif kind in ("css", "attr"):
+                self.plan.append((name, rule.get("selector"), rule.get("attr")))
+
+    @property
+    def valid(self):
+        return bool(self.selector and self.plan)
+
+    def extract(self, doc, html=None):
+        items = []
+        for card in doc.select(self.selector):
+            item = {}
+            for name, selector, attr in self.plan:
+                el = card.select_one(selector)
+                if not el:
+                    item = {}
+                    break
+                item[name] = el.get_text(" ", strip=True) if attr is None else el.get(attr)
+            if item:
+                items.append(item)
+        return items
+
+
+class AttrStrategy(CompiledStrategy):
+    """selector + attr: o valor do atributo de cada elemento."""
+
+    kind = "attr"
+
+    def __init__(self, strat):
+        super().__init__(strat)
+        self.attr = strat.get("attr")
+
+    @property
+    def valid(self):
+        return bool(self.selector and self.attr)
+
+    def extract(self, doc, html=None):
+        values = []
+        for el in doc.select(self.selector):
+            value = el.get(self.attr)
+            if value:
+                values.append(value)
+        return values
+
+
+class RegexStrategy(CompiledStrategy):
+    """type regex + pattern: grupo 1 de cada match no HTML bruto."""
+
+    kind = "regex"
+    needs_dom = False
+
+    def __init__(self, strat):
+        super().__init__(strat)
+        try:
+            self.regex = re.compile(strat.get("pattern") or "")
+        except re.error:
+            self.regex = None
+
+    @property
+    def valid(self):
+        return self.regex is not None and bool(self.regex.pattern)
+
+    def extract(self, doc, html=None):
+        if not html:
+            return []
+        return [m.group(1) if m.groups() else m.group(0) for m in self.regex.finditer(html)]
+
+
+def compile_strategy(strat):
+    if strat.get("type") == "regex":
+        return RegexStrategy(strat)
+    if strat.get("fields"):
+        return CardStrategy(strat)
+    if strat.get("attr"):
+        return AttrStrategy(strat)
+    return CardStrategy(strat)  # sem plano: valid == False
@@ -1,65 +1,191 @@
 # rules/loader.py
+import atexit
 import json
 import os
+import threading
+import time
 from copy import deepcopy
+from types import MappingProxyType
+
+from core.storage import atomic_write_json
+from rules.compiled import compile_strategy
+from rules.bandit import StrategyStats, ordenar
 
 RULES_DIR = os.path.dirname(__file__)
 
-class RuleLoader:
+FLUSH_A_CADA = 50       # updates de score acumulados antes de gravar
+FLUSH_INTERVALO = 30.0  # segundos máximos com deltas pendentes
+
+
+def _congelar(obj):
+    """Cópia somente-leitura: dict → MappingProxyType, list → tuple."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _congelar(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_congelar(v) for v in obj)
+    return obj
+
+
+class _RuleFile:
+    def __init__(self, data, mtime, anterior=None):
+        self.data = data              # dict mutável (só o loader mexe)
+        self.mtime = mtime
+        self.view = _congelar(data)   # o que os scrapers recebem
+        self._compiled = None
+
+        # sucesso/custo por strategy (bandit), persistidos em "stats"
+        self.stats = {
+            s.get("name"): StrategyStats.from_dict(s.get("stats"))
+            for s in data.get("strategies", [])
+        }
+
+        # Mesma versão após um flush de scores: só score/ordem mudaram,
+        # então as strategies compiladas são reaproveitadas pelo nome
+        if anterior is not None and anterior.version == self.version:
+            self._por_nome = anterior._por_nome
+        else:
+            self._por_nome = {}
+
+    @property
+    def version(self):
+        return self.data.get("version", 1)
+
+    def compiled(self):
+        if self._compiled is None:
+            compiled = []
+            for strat in self.data.get("strategies", []):
+                c = self._por_nome.get(strat.get("name"))
+                if c is None:
+                    c = self._por_nome[strat.get("name")] = compile_strategy(strat)
+                c.score = strat.get("score", 0)
+                compiled.append(c)
+            self._compiled = tuple(compiled)
+        return self._compiled
+
+
+# Estado compartilhado por todas as instâncias de RuleLoader do processo
+_lock = threading.RLock()
+_files = {}       # filename → _RuleFile
+_pendentes = {}   # filename → {strategy_name: delta acumulado}
+_n_pendentes = 0
+_ultimo_flush = time.monotonic()
 
-    def __init__(self):
-        self.cache = {}
+
+class RuleLoader:
+    """
+    Acesso às rules/*.json.
+    - load() devolve uma view somente-leitura compartilhada (sem deepcopy)
+    - update_score() acumula deltas em memória; a gravação (atômica) é feita
+      a cada FLUSH_A_CADA updates, a cada FLUSH_INTERVALO segundos e no exit
+    """
 
     def _path(self, name):
         return os.path.join(RULES_DIR, name)
 
-    def load(self, filename):
-        if filename in self.cache:
-            return deepcopy(self.cache[filename])
-
+    def _file(self, filename):
         path = self._path(filename)
         if not os.path.exists(path):
             raise FileNotFoundError(f"Rule file nÃ£o encontrado: {filename}")
 
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        mtime = os.path.getmtime(path)
+        with _lock:
+            rf = _files.get(filename)
+            if rf is None or rf.mtime != mtime:
+                # primeira leitura ou arquivo alterado por fora (IA, git)
+                with open(path, "r", encoding="utf-8") as f:
+                    rf = _files[filename] = _RuleFile(json.load(f), mtime)
+            return rf
 
-        self.cache[filename] = data
-        return deepcopy(data)
+    def load(self, filename):
+        return self._file(filename).view
 
-    def save(self, filename, data):
+    def save(self, filename, data, _anterior=None):
         path = self._path(filename)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-
-        self.cache[filename] = data
+        with _lock:
+            atomic_write_json(path, data)
+            _files[filename] = _RuleFile(data, os.path.getmtime(path), _anterior)
 
     def get_strategies(self, filename):
         data = self.load(filename)
-        return data.get("strategies", [])
-
+        return data.get("strategies", ())
+
+    def get_compiled(self, filename):
+        """
+        Strategies compiladas (rules.compiled), em ordem de score.
+        Compartilhadas por todos os scrapers; recompiladas só quando o
+        arquivo muda de versão ou é alterado por fora (mtime).
+        """
+        return self._file(filename).compiled()
+
+    def get_ordered(self, filename):
+        """Strategies compiladas na ordem do bandit (UCB sobre sucesso recente)."""
+        rf = self._file(filename)
+        with _lock:
+            return ordenar(rf.compiled(), rf.stats)
+
+    def get_stats(self, filename):
+        return self._file(filename).stats
+
+    def record(self, filename, strategy_name, sucesso, custo_ms):
+        """Resultado de uma tentativa: alimenta o bandit e o score (±0.05)."""
+        rf = self._file(filename)
+        with _lock:
+            rf.stats.setdefault(strategy_name, StrategyStats()).registrar(sucesso, custo_ms)
+        self.update_score(filename, strategy_name, +0.05 if sucesso else -0.05)
+
+    # --------------------------------------------------
+    # SCORES (WRITE-BEHIND)
+    # --------------------------------------------------
     def update_score(self, filename, strategy_name, delta):
-        data = self.load(filename)
+        global _n_pendentes
+
+        with _lock:
+            deltas = _pendentes.setdefault(filename, {})
+            deltas[strategy_name] = deltas.get(strategy_name, 0) + delta
+            _n_pendentes += 1
+
+            if _n_pendentes >= FLUSH_A_CADA or time.monotonic() - _ultimo_flush >= FLUSH_INTERVALO:
+                self.flush()
+
+    def flush(self):
+        """Aplica os deltas pendentes e grava cada rule file alterado."""
+        global _n_pendentes, _ultimo_flush
+
+        with _lock:
+            pendentes = dict(_pendentes)
+            _pendentes.clear()
+            _n_pendentes = 0
+            _ultimo_flush = time.monotonic()
 
-        for s in data.get("strategies", []):
-            if s.get("name") == strategy_name:
-                s["score"] = round(max(0, s.get("score", 0) + delta), 3)
+            for filename, deltas in pendentes.items():
+                anterior = self._file(filename)
+                data = deepcopy(anterior.data)
 
-        # ordena por score
-        data["strategies"].sort(
-            key=lambda x: x.get("score", 0),
-            reverse=True
-        )
+                for s in data.get("strategies", []):
+                    if s.get("name") in deltas:
+                        s["score"] = round(max(0, s.get("score", 0) + deltas[s["name"]]), 3)
+                    if s.get("name") in anterior.stats and anterior.stats[s["name"]].pulls:
+                        s["stats"] = anterior.stats[s["name"]].to_dict()
 
-        self.save(filename, data)
+                # ordena por score
+                data.setdefault("strategies", []).sort(
+                    key=lambda x: x.get("score", 0),
+                    reverse=True
+                )
+
+                self.save(filename, data, _anterior=anterior)
 
     def add_strategy(self, filename, strategy):
-        data = self.load(filename)
+        with _lock:
+            data = deepcopy(self._file(filename).data)
+
+            strategy = deepcopy(strategy)
+            strategy.setdefault("score", 0.5)
+
+            data.setdefault("strategies", []).insert(0, strategy)
+            data["version"] = data.get("version", 1) + 1
 
-        strategy = deepcopy(strategy)
-        strategy.setdefault("score", 0.5)
+            self.save(filename, data)
 
-        data.setdefault("strategies", []).insert(0, strategy)
-        data["version"] = data.get("version", 1) + 1
 
-        self.save(filename, data)
\ No newline at end of file
+atexit.register(lambda: RuleLoader().flush())
@@ -1,12 +1,63 @@
 # -*- coding: utf-8 -*-
 # anilist_api.py
-import time
-import requests
 import re
 import unicodedata
+from difflib import SequenceMatcher
+from sites.goyabu.AniList.client import get_anilist_client
+from sites.goyabu.AniList.cache import get_anilist_cache, normalizar_chave
+from sites.goyabu.AniList.title_index import get_title_index, titulos_do_media
 from sites.goyabu.AniList.models import Anime, Title, Staff, Character, VoiceActor, Relation, Trailer
 
-ANILIST_URL = "https://graphql.anilist.co"
+# -------------------------
+# PERFIS DE CONSULTA
+# -------------------------
+LIMITE_STAFF = 25       # edges de staff no perfil full
+LIMITE_PERSONAGENS = 25  # edges de personagens no perfil full
+
+_CAMPOS_MATCH = '''
+        id
+        title { romaji english native }
+        synonyms
+'''
+
+_CAMPOS_BASE = _CAMPOS_MATCH + '''
+        description
+        episodes
+        duration
+        genres
+        season
+        seasonYear
+        type
+        status
+        averageScore
+        popularity
+        favourites
+        coverImage { large }
+        bannerImage
+        studios { nodes { name } }
+'''
+
+_CAMPOS_FULL = _CAMPOS_BASE + f'''
+        rankings {{ rank type }}
+        trailer {{ site id thumbnail }}
+        staff(perPage: {LIMITE_STAFF}, sort: RELEVANCE) {{ edges {{ role node {{ name {{ full }} language image {{ large }} }} }} }}
+        characters(perPage: {LIMITE_PERSONAGENS}, sort: [ROLE, RELEVANCE]) {{ edges {{ node {{ name {{ full }} image {{ large }} }} voiceActors {{ name {{ full }} language image {{ large }} }} }} }}
+        relations {{ edges {{ node {{ id title {{ romaji english native }} type }} }} }}
+        externalLinks {{ site url }}
+'''
+
+# match: só ID e títulos (escolha do candidato)
+# full: payload completo de construir_anime_obj (o único que vai para o cache);
+#       staff e personagens vêm só na 1ª página, com LIMITE_* edges
+PERFIS = {
+    "match": _CAMPOS_MATCH,
+    "full": _CAMPOS_FULL,
+}
+MEDIA_FIELDS = PERFIS["full"]
+
+TAMANHO_LOTE = 25       # títulos por requisição (perfil match)
+TAMANHO_LOTE_FULL = 10  # Medias por requisição (perfil full)
+CANDIDATOS_POR_BUSCA = 5
 
 
 # -------------------------
@@ -14,32 +65,8 @@ ANILIST_URL = "https://graphql.anilist.co"
 # -------------------------
 def _post_graphql(query, variables, retries=10, delay=2, max_delay=64):
     """Wrapper para requisiÃ§Ãµes GraphQL com retry e backoff exponencial"""
-    attempt = 0
-    while attempt < retries:
-        try:
-            response = requests.post(ANILIST_URL, json={"query": query, "variables": variables})
-            if response.status_code == 429:
-                raise requests.exceptions.HTTPError(response=response)
-            response.raise_for_status()
-            return response.json()["data"]
-        except requests.exceptions.HTTPError as e:
-            code = e.response.status_code
-            wait = min(delay * 2 ** attempt, max_delay)
-            if code in [429, 500, 502, 503, 504]:
-                print(f"[Retry {attempt+1}/{retries}] Erro {code}, aguardando {wait}s...")
-                time.sleep(wait)
-                attempt += 1
-            else:
-                print(f"Erro HTTP {code}: {e}")
-                return None
-        except requests.exceptions.RequestException as e:
-            wait = min(delay * 2 ** attempt, max_delay)
-            print(f"[Retry {attempt+1}/{retries}] Erro de rede: {e}, aguardando {wait}s...")
-            time.sleep(wait)
-            attempt += 1
-    print(f"Falha apÃ³s {retries} tentativas para variÃ¡veis {variables}")
-    return None
-    
+    return get_anilist_client().post(query, variables, retries=retries, delay=delay, max_delay=max_delay)
+
 # ------------------------------------------------------------------
 # FunÃ§Ã£o melhorada para busca de tÃ­tulos disponÃ­veis (fuzzy / parcial)
 # ------------------------------------------------------------------
@@ -161,87 +188,282 @@ def construir_anime_obj(media):
 # -------------------------
 # BUSCA POR ID
 # -------------------------
-def buscar_detalhes_anime(id_anime: int):
+def buscar_detalhes_anime(id_anime: int, perfil: str = "full"):
+    cache = get_anilist_cache()
+    media = cache.get_media(id_anime)
+    if media:
+        return construir_anime_obj(media)
+
     query = '''
     query ($id: Int) {
-      Media(id: $id, type: ANIME) {
-        id
-        title { romaji english native }
-        description
-        episodes
-        duration
-        genres
-        season
-        seasonYear
-        type
-        status
-        averageScore
-        popularity
-        favourites
-        rankings { rank type }
-        coverImage { large }
-        bannerImage
-        trailer { site id thumbnail }
-        studios { nodes { name } }
-        staff { edges { role node { name { full } language image { large } } } }
-        characters { edges { node { name { full } image { large } } voiceActors { name { full } language image { large } } } }
-        relations { edges { node { id title { romaji english native } type } } }
-        externalLinks { site url }
-      }
+      Media(id: $id, type: ANIME) {''' + PERFIS[perfil] + '''}
     }'''
     variables = {"id": id_anime}
 
     data = _post_graphql(query, variables)
-    if not data or "Media" not in data:
-        return None
+    if not data or not data.get("Media"):
+        media = cache.get_media(id_anime, fresh_only=False)
+        return construir_anime_obj(media) if media else None
+
+    if perfil == "full":
+        cache.put_media(data["Media"])
+        get_title_index().adicionar_media(data["Media"])
     return construir_anime_obj(data["Media"])
 
 
 # -------------------------
-# BUSCA POR TÃTULO COM FALLBACK
+# CANDIDATOS (PERFIL MATCH)
 # -------------------------
-def buscar_detalhes_anime_por_titulo(titulo: str):
-    """Busca anime pelo tÃ­tulo, faz segunda tentativa com primeiros 20 caracteres se falhar"""
+def escolher_candidato(titulo, candidatos):
+    """Candidato cujo título mais se parece com `titulo` (empate: ordem do AniList)."""
+    alvo = normalizar_chave(titulo)
+    melhor, melhor_score = None, -1.0
+    for media in candidatos or []:
+        score = max(
+            (SequenceMatcher(None, alvo, normalizar_chave(t)).ratio() for t in titulos_do_media(media)),
+            default=0.0
+        )
+        if score > melhor_score:
+            melhor, melhor_score = media, score
+    return melhor
+
+
+def buscar_candidatos(busca: str, limite: int = CANDIDATOS_POR_BUSCA):
+    """
+    Busca leve: só ID e títulos dos `limite` melhores resultados.
+    Retorna lista (vazia se nada casar) ou None se a requisição falhar.
+    """
     query = '''
-    query ($search: String) {
-      Media(search: $search, type: ANIME) {
-        id
-        title { romaji english native }
-        description
-        episodes
-        duration
-        genres
-        season
-        seasonYear
-        type
-        status
-        averageScore
-        popularity
-        favourites
-        rankings { rank type }
-        coverImage { large }
-        bannerImage
-        trailer { site id thumbnail }
-        studios { nodes { name } }
-        staff { edges { role node { name { full } language image { large } } } }
-        characters { edges { node { name { full } image { large } } voiceActors { name { full } language image { large } } } }
-        relations { edges { node { id title { romaji english native } type } } }
-        externalLinks { site url }
-      }
+    query ($search: String, $perPage: Int) {
+      Page(perPage: $perPage) { media(search: $search, type: ANIME, sort: SEARCH_MATCH) {''' + PERFIS["match"] + '''} }
     }'''
+    data = _post_graphql(query, {"search": busca, "perPage": limite})
+    if data is None:
+        return None
+    return (data.get("Page") or {}).get("media") or []
 
-    # 1Âª tentativa: tÃ­tulo completo
-    variables = {"search": titulo}
-    data = _post_graphql(query, variables)
 
-    # 2Âª tentativa: primeiros 20 caracteres se falhar
-    if not data or "Media" not in data:
+# -------------------------
+# BUSCA POR TÍTULO COM FALLBACK
+# -------------------------
+def buscar_detalhes_anime_por_titulo(titulo: str):
+    """
+    Busca anime pelo título, faz segunda tentativa com primeiros 20 caracteres se falhar.
+    Candidatos vêm no perfil match; o detalhe completo é buscado uma vez, pelo ID escolhido.
+    """
+    cache = get_anilist_cache()
+    em_cache, media_id = cache.lookup_title(titulo)
+    if em_cache:
+        return buscar_detalhes_anime(media_id) if media_id else None
+
+    # índice local de títulos: um candidato confiável dispensa a busca na rede
+    # (não vai para o cache de títulos; o índice é remontado a cada execução)
+    media_id = get_title_index().melhor(titulo)
+    if media_id:
+        return buscar_detalhes_anime(media_id)
+
+    # 1ª tentativa: título completo
+    candidatos = buscar_candidatos(titulo)
+
+    # 2ª tentativa: primeiros 20 caracteres se falhar
+    if not candidatos:
         curto = titulo[:20]
-        print(f"â ï¸ 1Âª tentativa falhou para '{titulo}', tentando com '{curto}'...")
-        variables = {"search": curto}
-        data = _post_graphql(query, variables)
-        if not data or "Media" not in data:
-            print(f"â Nenhum resultado para '{titulo}'")
+        print(f"⚠️ 1ª tentativa falhou para '{titulo}', tentando com '{curto}'...")
+        respondido = candidatos is not None
+        candidatos = buscar_candidatos(curto)
+        if not candidatos:
+            print(f"❌ Nenhum resultado para '{titulo}'")
+            if respondido and candidatos is not None:
+                cache.put_title(titulo, None)
             return None
 
-    return construir_anime_obj(data["Media"])
\ No newline at end of file
+    escolhido = escolher_candidato(titulo, candidatos)
+    cache.put_title(titulo, escolhido["id"])
+    get_title_index().adicionar_media(escolhido)
+    return buscar_detalhes_anime(escolhido["id"])
+
+
+# -------------------------
+# BUSCA EM LOTE POR TÍTULOS
+# -------------------------
+def _buscar_lote(titulos):
+    """
+    Resolve vários títulos numa única requisição (perfil match), um alias
+    Page { media(search:) } por título (busca sem resultado volta como
+    lista vazia em vez de derrubar o lote).
+    Retorna {titulo: candidato escolhido | None}, ou None se a requisição falhar.
+    """
+    declaracoes = ", ".join(f"$s{i}: String" for i in range(len(titulos)))
+    campos = "\n".join(
+        f"      p{i}: Page(perPage: {CANDIDATOS_POR_BUSCA}) "
+        f"{{ media(search: $s{i}, type: ANIME, sort: SEARCH_MATCH) {{{PERFIS['match']}}} }}"
+        for i in range(len(titulos))
+    )
+    query = f"query ({declaracoes}) {{\n{campos}\n    }}"
+    variables = {f"s{i}": t for i, t in enumerate(titulos)}
+
+    data = _post_graphql(query, variables)
+    if not data:
+        return None
+
+    resultado = {}
+    for i, titulo in enumerate(titulos):
+        candidatos = (data.get(f"p{i}") or {}).get("media") or []
+        resultado[titulo] = escolher_candidato(titulo, candidatos)
+    return resultado
+
+
+def _buscar_candidatos_em_lote(titulos, tamanho_lote):
+    resultado = {}
+    for inicio in range(0, len(titulos), tamanho_lote):
+        lote = titulos[inicio:inicio + tamanho_lote]
+        candidatos = _buscar_lote(lote)
+
+        if candidatos is None and len(lote) > 1:
+            # ex.: limite de complexidade da query — divide o lote ao meio
+            candidatos = _buscar_candidatos_em_lote(lote, max(1, len(lote) // 2))
+
+        # títulos de um lote que falhou ficam fora do resultado
+        resultado.update(candidatos or {})
+    return resultado
+
+
+def _buscar_lote_ids(ids):
+    """
+    Payloads completos de vários IDs numa requisição (Page { media(id_in:) }).
+    Retorna {id: media}, ou None se a requisição falhar.
+    """
+    query = '''
+    query ($ids: [Int], $perPage: Int) {
+      Page(perPage: $perPage) { media(id_in: $ids, type: ANIME) {''' + PERFIS["full"] + '''} }
+    }'''
+
+    data = _post_graphql(query, {"ids": ids, "perPage": len(ids)})
+    if not data:
+        return None
+    return {media["id"]: media for media in (data.get("Page") or {}).get("media") or []}
+
+
+def _buscar_medias_por_ids(ids, tamanho_lote=TAMANHO_LOTE_FULL):
+    """Payloads completos de Media por ID, em lotes; lote que falha é dividido ao meio."""
+    resultado = {}
+    for inicio in range(0, len(ids), tamanho_lote):
+        lote = ids[inicio:inicio + tamanho_lote]
+        medias = _buscar_lote_ids(lote)
+
+        if medias is None and len(lote) > 1:
+            # ex.: limite de complexidade da query — divide o lote ao meio
+            medias = _buscar_medias_por_ids(lote, max(1, len(lote) // 2))
+
+        # IDs de um lote que falhou ficam fora do resultado
+        resultado.update(medias or {})
+    return resultado
+
+
+def buscar_detalhes_animes_em_lote(titulos, tamanho_lote=TAMANHO_LOTE):
+    """
+    Versão em lote de buscar_detalhes_anime_por_titulo: os IDs saem de
+    buscas leves agrupadas (com o mesmo fallback de 20 caracteres) e o
+    detalhe completo de uma busca por IDs. Títulos e payloads já no
+    AniListCache não vão para a rede. Retorna {titulo: Anime | None}.
+    """
+    cache = get_anilist_cache()
+    unicos = list(dict.fromkeys(t for t in titulos if t))
+
+    # 1) título → ID
+    index = get_title_index()
+    ids = {}
+    sem_cache = []
+    for titulo in unicos:
+        em_cache, media_id = cache.lookup_title(titulo)
+        if not em_cache:
+            media_id = index.melhor(titulo)
+            em_cache = media_id is not None
+        if em_cache:
+            ids[titulo] = media_id
+        else:
+            sem_cache.append(titulo)
+
+    if sem_cache:
+        escolhidos = _buscar_candidatos_em_lote(sem_cache, tamanho_lote)
+
+        # 2ª tentativa: primeiros 20 caracteres dos que falharam
+        curtos = {t: t[:20] for t in sem_cache if escolhidos.get(t) is None}
+        escolhidos_curtos = {}
+        if curtos:
+            print(f"⚠️ {len(curtos)} título(s) sem resultado, tentando com os primeiros 20 caracteres...")
+            escolhidos_curtos = _buscar_candidatos_em_lote(list(dict.fromkeys(curtos.values())), tamanho_lote)
+
+        for titulo in sem_cache:
+            escolhido = escolhidos.get(titulo)
+            respondido = titulo in escolhidos
+            if escolhido is None and titulo in curtos:
+                escolhido = escolhidos_curtos.get(curtos[titulo])
+                respondido = respondido and curtos[titulo] in escolhidos_curtos
+
+            if escolhido:
+                cache.put_title(titulo, escolhido["id"])
+                index.adicionar_media(escolhido)
+            elif respondido:
+                # só guarda "não encontrado" quando o AniList respondeu
+                cache.put_title(titulo, None)
+            ids[titulo] = escolhido["id"] if escolhido else None
+
+    # 2) ID → payload completo (uma busca por ID para todos os que faltam)
+    animes = buscar_detalhes_animes_por_ids([i for i in ids.values() if i])
+    return {titulo: animes.get(media_id) if media_id else None for titulo, media_id in ids.items()}
+
+
+def buscar_detalhes_animes_por_ids(ids):
+    """
+    Versão em lote de buscar_detalhes_anime: payloads frescos saem do
+    AniListCache, os demais (novos ou vencidos pelo TTL) de buscas
+    Page(id_in:) agrupadas. Retorna {id: Anime | None}.
+    """
+    cache = get_anilist_cache()
+    index = get_title_index()
+
+    medias = {}
+    faltando = []
+    for media_id in dict.fromkeys(ids):
+        medias[media_id] = cache.get_media(media_id)
+        if medias[media_id] is None:
+            faltando.append(media_id)
+
+    if faltando:
+        buscados = _buscar_medias_por_ids(faltando)
+        for media_id in faltando:
+            media = buscados.get(media_id)
+            if media:
+                cache.put_media(media)
+                index.adicionar_media(media)
+            else:
+                media = cache.get_media(media_id, fresh_only=False)
+            medias[media_id] = media
+
+    return {media_id: construir_anime_obj(media) if media else None for media_id, media in medias.items()}
+
+
+# -------------------------
+# MAPEAMENTO URL DO GOYABU → ANILIST
+# -------------------------
+def buscar_detalhes_anime_por_url(url: str):
+    """Anime já associado a esta URL do Goyabu, se houver (cache ou busca por ID)."""
+    media_id = get_anilist_cache().lookup_url(url)
+    return buscar_detalhes_anime(media_id) if media_id else None
+
+
+def buscar_detalhes_animes_por_urls(urls):
+    """
+    Versão em lote de buscar_detalhes_anime_por_url: payloads vencidos dos
+    animes já associados são renovados juntos por ID.
+    Retorna {url: Anime} só para as URLs já associadas.
+    """
+    cache = get_anilist_cache()
+    ids = {url: cache.lookup_url(url) for url in dict.fromkeys(urls)}
+    animes = buscar_detalhes_animes_por_ids([i for i in ids.values() if i])
+    return {url: animes[media_id] for url, media_id in ids.items() if media_id and animes.get(media_id)}
+
+
+def associar_url(url: str, id_anime: int):
+    get_anilist_cache().put_url(url, id_anime)
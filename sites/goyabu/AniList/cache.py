@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# cache.py
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from core.http_cache import CACHE_DIR
+
+CACHE_FILE = CACHE_DIR / "anilist.sqlite"
+
+DIA = 86400
+
+# TTL do payload de Media conforme o status no AniList
+TTL_POR_STATUS = {
+    "RELEASING": 1 * DIA,
+    "NOT_YET_RELEASED": 3 * DIA,
+    "HIATUS": 7 * DIA,
+    "FINISHED": 90 * DIA,
+    "CANCELLED": 90 * DIA,
+}
+TTL_PADRAO = 7 * DIA
+
+TTL_MAPEAMENTO = 30 * DIA  # título/URL → ID
+TTL_NAO_ENCONTRADO = 3 * DIA  # título sem resultado no AniList
+
+
+def normalizar_chave(titulo):
+    """Chave estável para títulos: sem acentos, minúsculas, só alfanuméricos."""
+    t = unicodedata.normalize("NFD", titulo or "")
+    t = "".join(c for c in t if unicodedata.category(c) != "Mn")
+    t = re.sub(r"[^0-9a-z]+", " ", t.casefold())
+    return t.strip()
+
+
+class AniListCache:
+    """
+    Cache local do AniList em SQLite:
+    - media: payload bruto de Media (entrada de construir_anime_obj) por ID
+    - titles: título normalizado → ID (NULL = não encontrado)
+    - urls: URL do Goyabu → ID
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS media ("
+            " id INTEGER PRIMARY KEY, payload TEXT NOT NULL, status TEXT, fetched_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS titles ("
+            " key TEXT PRIMARY KEY, media_id INTEGER, fetched_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS urls ("
+            " url TEXT PRIMARY KEY, media_id INTEGER NOT NULL, fetched_at REAL NOT NULL);"
+        )
+        self._conn.commit()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _write(self, sql, params):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    # --------------------------------------------------
+    # MEDIA
+    # --------------------------------------------------
+    def get_media(self, media_id, fresh_only=True):
+        row = self._query("SELECT payload, status, fetched_at FROM media WHERE id = ?", (media_id,))
+        if not row:
+            return None
+
+        payload, status, fetched_at = row
+        if fresh_only and time.time() - fetched_at > TTL_POR_STATUS.get(status, TTL_PADRAO):
+            return None
+        return json.loads(payload)
+
+    def put_media(self, media):
+        self._write(
+            "INSERT OR REPLACE INTO media (id, payload, status, fetched_at) VALUES (?, ?, ?, ?)",
+            (media["id"], json.dumps(media, ensure_ascii=False), media.get("status"), time.time())
+        )
+
+    def iter_media(self):
+        """Todos os payloads em cache (frescos ou não)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM media").fetchall()
+        for (payload,) in rows:
+            yield json.loads(payload)
+
+    # --------------------------------------------------
+    # TÍTULO → ID
+    # --------------------------------------------------
+    def lookup_title(self, titulo):
+        """
+        Retorna (encontrado_no_cache, media_id). media_id None com
+        encontrado_no_cache True significa "AniList não tem esse título".
+        """
+        row = self._query("SELECT media_id, fetched_at FROM titles WHERE key = ?", (normalizar_chave(titulo),))
+        if not row:
+            return False, None
+
+        media_id, fetched_at = row
+        ttl = TTL_MAPEAMENTO if media_id is not None else TTL_NAO_ENCONTRADO
+        if time.time() - fetched_at > ttl:
+            return False, None
+        return True, media_id
+
+    def put_title(self, titulo, media_id):
+        self._write(
+            "INSERT OR REPLACE INTO titles (key, media_id, fetched_at) VALUES (?, ?, ?)",
+            (normalizar_chave(titulo), media_id, time.time())
+        )
+
+    # --------------------------------------------------
+    # URL DO GOYABU → ID
+    # --------------------------------------------------
+    def lookup_url(self, url):
+        row = self._query("SELECT media_id, fetched_at FROM urls WHERE url = ?", (url,))
+        if not row or time.time() - row[1] > TTL_MAPEAMENTO:
+            return None
+        return row[0]
+
+    def put_url(self, url, media_id):
+        self._write(
+            "INSERT OR REPLACE INTO urls (url, media_id, fetched_at) VALUES (?, ?, ?)",
+            (url, media_id, time.time())
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_anilist_cache():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = AniListCache()
+        return _shared
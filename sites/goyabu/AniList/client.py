@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# client.py
+import threading
+import time
+
+import requests
+
+from core.rate_limiter import RATE_LIMITER
+
+ANILIST_URL = "https://graphql.anilist.co"
+
+JANELA_PADRAO = 60  # AniList conta o limite por minuto
+RESERVA = 2         # requisições guardadas antes de esperar o reset
+
+
+class AniListClient:
+    """
+    Cliente GraphQL do AniList com Session keep-alive.
+    Lê X-RateLimit-Limit/Remaining/Reset e Retry-After para desacelerar
+    antes de tomar 429, e contabiliza requisições, 429s e tempo de espera.
+    """
+
+    def __init__(self, url=ANILIST_URL, limiter=None):
+        self.url = url
+        self.limiter = limiter or RATE_LIMITER
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        })
+
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+
+        self.stats = {
+            "requests": 0,
+            "throttled": 0,
+            "errors": 0,
+            "wait_seconds": 0.0,
+        }
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    # RITMO
+    # --------------------------------------------------
+    def _sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+            with self._lock:
+                self.stats["wait_seconds"] += seconds
+
+    def _pace(self):
+        waited = self.limiter.wait(self.url)
+        with self._lock:
+            self.stats["wait_seconds"] += waited
+            remaining, reset_at = self.remaining, self.reset_at
+
+        if remaining is None or not reset_at:
+            return
+
+        if remaining <= RESERVA:
+            # orçamento da janela no fim: espera o reset em vez de tomar 429
+            self._sleep(reset_at - time.time())
+            with self._lock:
+                self.remaining = None
+        elif self.limit and remaining < self.limit / 2:
+            # metade da janela gasta: distribui o que sobrou até o reset
+            self._sleep((reset_at - time.time()) / remaining)
+
+    def _read_headers(self, response):
+        headers = response.headers
+        with self._lock:
+            if headers.get("X-RateLimit-Limit"):
+                self.limit = int(headers["X-RateLimit-Limit"])
+            if headers.get("X-RateLimit-Remaining"):
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+                if self.reset_at is None or self.reset_at < time.time():
+                    self.reset_at = time.time() + JANELA_PADRAO
+            if headers.get("X-RateLimit-Reset"):
+                self.reset_at = float(headers["X-RateLimit-Reset"])
+
+    # --------------------------------------------------
+    # POST
+    # --------------------------------------------------
+    def post(self, query, variables, retries=10, delay=2, max_delay=64):
+        """Requisição GraphQL com retry e backoff exponencial; retorna `data` ou None"""
+        attempt = 0
+        while attempt < retries:
+            try:
+                self._pace()
+                with self._lock:
+                    self.stats["requests"] += 1
+                response = self.session.post(self.url, json={"query": query, "variables": variables})
+                self._read_headers(response)
+                retry_after = self.limiter.feedback(self.url, response.status_code, response.headers)
+                if response.status_code == 429:
+                    with self._lock:
+                        self.stats["throttled"] += 1
+                    raise requests.exceptions.HTTPError(response=response)
+                response.raise_for_status()
+                return response.json()["data"]
+            except requests.exceptions.HTTPError as e:
+                code = e.response.status_code
+                wait = min(delay * 2 ** attempt, max_delay)
+                if code in [429, 503] and retry_after is not None:
+                    # o RateLimiter já pausou o host pelo Retry-After
+                    print(f"[Retry {attempt+1}/{retries}] Erro {code}, Retry-After {retry_after:.0f}s...")
+                    attempt += 1
+                elif code in [429, 500, 502, 503, 504]:
+                    print(f"[Retry {attempt+1}/{retries}] Erro {code}, aguardando {wait}s...")
+                    self._sleep(wait)
+                    attempt += 1
+                else:
+                    with self._lock:
+                        self.stats["errors"] += 1
+                    print(f"Erro HTTP {code}: {e}")
+                    return None
+            except requests.exceptions.RequestException as e:
+                with self._lock:
+                    self.stats["errors"] += 1
+                wait = min(delay * 2 ** attempt, max_delay)
+                print(f"[Retry {attempt+1}/{retries}] Erro de rede: {e}, aguardando {wait}s...")
+                self._sleep(wait)
+                attempt += 1
+        print(f"Falha após {retries} tentativas para variáveis {variables}")
+        return None
+
+    # --------------------------------------------------
+    def resumo(self):
+        s = self.stats
+        return (
+            f"📈 AniList: {s['requests']} requisições, {s['throttled']} x 429, "
+            f"{s['errors']} erros, {s['wait_seconds']:.1f}s aguardando limite"
+        )
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_anilist_client():
+    """Cliente compartilhado (uma Session para o processo inteiro)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = AniListClient()
+        return _shared
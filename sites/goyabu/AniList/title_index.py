@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# title_index.py
+import re
+import threading
+from collections import defaultdict
+
+from sites.goyabu.AniList.cache import get_anilist_cache, normalizar_chave
+
+TOP_K = 5
+CONFIANCA = 0.8   # score mínimo do melhor candidato
+MARGEM = 0.1      # vantagem mínima sobre o segundo colocado
+
+# Números, ordinais e marcadores de temporada/parte: "2nd season" e
+# "3rd season" ficam perto no Dice, mas são animes diferentes
+MARCADORES = re.compile(
+    r"\d+|\b(?:ii|iii|iv|v|vi|vii|viii|ix|x|season|part|cour|final|movie|film|ova|ona|special)\b"
+)
+
+
+def titulos_do_media(media):
+    """Todos os títulos conhecidos de um Media: romaji, english, native e sinônimos."""
+    title = media.get("title") or {}
+    titulos = [title.get("romaji"), title.get("english"), title.get("native")]
+    titulos += media.get("synonyms") or []
+    return [t for t in titulos if t]
+
+
+def trigramas(chave):
+    """Trigramas da chave normalizada, com borda como no pg_trgm."""
+    if not chave:
+        return set()
+    texto = f"  {chave} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def marcadores(chave):
+    """Números e marcadores de temporada da chave normalizada."""
+    return sorted(m.lstrip("0") or "0" for m in MARCADORES.findall(chave))
+
+
+class TitleIndex:
+    """
+    Índice local de títulos do AniList (romaji, english, native e sinônimos
+    dos payloads em cache) com postings por trigrama.
+    buscar() devolve os IDs mais parecidos sem tocar na rede; melhor() só
+    aceita um candidato confiável (ver melhor()).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = []          # doc → media_id
+        self._docs = []         # doc → chave normalizada
+        self._tamanhos = []     # doc → nº de trigramas
+        self._chaves = {}       # chave normalizada → doc
+        self._ambiguas = set()  # chaves compartilhadas por IDs diferentes
+        self._postings = defaultdict(list)
+
+    # --------------------------------------------------
+    # INDEXAÇÃO
+    # --------------------------------------------------
+    def adicionar(self, media_id, titulo):
+        chave = normalizar_chave(titulo)
+        grams = trigramas(chave)
+        if not grams:
+            return
+
+        with self._lock:
+            doc = self._chaves.get(chave)
+            if doc is not None:
+                if self._ids[doc] != media_id:
+                    self._ambiguas.add(chave)
+                return
+
+            doc = len(self._ids)
+            self._ids.append(media_id)
+            self._docs.append(chave)
+            self._tamanhos.append(len(grams))
+            self._chaves[chave] = doc
+            for g in grams:
+                self._postings[g].append(doc)
+
+    def adicionar_media(self, media):
+        for titulo in titulos_do_media(media):
+            self.adicionar(media["id"], titulo)
+
+    def __len__(self):
+        return len(self._ids)
+
+    # --------------------------------------------------
+    # CONSULTA
+    # --------------------------------------------------
+    def _candidatos(self, chave, k):
+        """Até k trios (media_id, score, chave do título que casou) por score (Dice sobre trigramas)."""
+        grams = trigramas(chave)
+        if not grams:
+            return []
+
+        with self._lock:
+            comuns = defaultdict(int)
+            for g in grams:
+                for doc in self._postings.get(g, ()):
+                    comuns[doc] += 1
+
+            melhores = {}
+            for doc, n in comuns.items():
+                score = 2 * n / (len(grams) + self._tamanhos[doc])
+                media_id = self._ids[doc]
+                if media_id not in melhores or score > melhores[media_id][1]:
+                    melhores[media_id] = (media_id, score, self._docs[doc])
+
+        return sorted(melhores.values(), key=lambda x: x[1], reverse=True)[:k]
+
+    def buscar(self, titulo, k=TOP_K):
+        """Retorna até k pares (media_id, score) ordenados por score."""
+        return [(media_id, score) for media_id, score, _ in self._candidatos(normalizar_chave(titulo), k)]
+
+    def melhor(self, titulo):
+        """
+        ID do anime de `titulo` sem ir à rede, ou None (vai para a rede).
+        Aceita a chave normalizada exata (se não for compartilhada por IDs
+        diferentes) ou o melhor do buscar() quando:
+        - o score é >= CONFIANCA
+        - fica MARGEM acima do segundo colocado
+        - tem os mesmos números/marcadores de temporada do título
+          ("Jujutsu Kaisen 3rd Season" fica a 0.85 da 2nd Season)
+        """
+        chave = normalizar_chave(titulo)
+        with self._lock:
+            doc = self._chaves.get(chave)
+            if doc is not None:
+                return None if chave in self._ambiguas else self._ids[doc]
+
+        candidatos = self._candidatos(chave, 2)
+        if not candidatos:
+            return None
+
+        media_id, score, encontrada = candidatos[0]
+        segundo = candidatos[1][1] if len(candidatos) > 1 else 0.0
+        if (
+            score < CONFIANCA
+            or score - segundo < MARGEM
+            or encontrada in self._ambiguas
+            or marcadores(encontrada) != marcadores(chave)
+        ):
+            return None
+        return media_id
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_title_index():
+    """Índice compartilhado, montado uma vez a partir do AniListCache."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            index = TitleIndex()
+            for media in get_anilist_cache().iter_media():
+                index.adicionar_media(media)
+            _shared = index
+        return _shared
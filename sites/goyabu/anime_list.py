@@ -1,12 +1,15 @@
 # sites/goyabu/anime_list.py
+import asyncio
 import re
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
 
 from core.fetcher import Fetcher
+from core.async_fetcher import AsyncFetcher
+from core.parser import parse_html
 from core.detector import BreakDetector
 from core.validator import Validator
 from rules.loader import RuleLoader
+from rules.bandit import run_strategies
 from ai.learner import RuleLearner
 
 BASE = "https://goyabu.io"
@@ -14,8 +17,9 @@ BASE = "https://goyabu.io"
 
 class GoyabuAnimeListScraper:
 
-    def __init__(self):
+    def __init__(self, async_fetcher=None):
         self.fetcher = Fetcher(base_url=BASE)
+        self.async_fetcher = async_fetcher or AsyncFetcher(base_url=BASE)
         self.rules = RuleLoader()
         self.learner = RuleLearner()
 
@@ -23,78 +27,58 @@ class GoyabuAnimeListScraper:
     # API PÃBLICA
     # --------------------------------------------------
     def listar(self, pagina=1):
-        url = f"{BASE}/lista-de-animes/page/{pagina}?l=todos&pg={pagina}"
+        url = self._url_pagina(pagina)
         html = self.fetcher.get(url)
+        return self._processar(html, url)
 
-        animes = self._extract_with_rules(html)
+    async def listar_async(self, pagina=1):
+        url = self._url_pagina(pagina)
+        html = await self.async_fetcher.get(url)
+        # fora do loop: o fallback pode chamar a IA (RuleLearner), que é síncrona
+        return await asyncio.to_thread(self._processar, html, url)
+
+    def _url_pagina(self, pagina):
+        return f"{BASE}/lista-de-animes/page/{pagina}?l=todos&pg={pagina}"
+
+    def _processar(self, html, url=None):
+        animes = self._extract_with_rules(html, url)
 
         # ð fallback inteligente com IA
         if BreakDetector.should_trigger_ai("anime_list", animes):
             print("â ï¸ Regras falharam, acionando IA para aprender...")
             self.learner.learn(html, "anime_list")
-            animes = self._extract_with_rules(html)
+            animes = self._extract_with_rules(html, url)
 
         return animes
 
     # --------------------------------------------------
     # EXTRAÃÃO BASEADA EM REGRAS
     # --------------------------------------------------
-    def _extract_with_rules(self, html):
-        soup = BeautifulSoup(html, "html.parser")
-        strategies = self.rules.get_strategies("anime_list.json")
-
-        for strat in strategies:
-            results = self._apply_strategy(soup, strat)
-
-            if results:
-                self.rules.update_score(
-                    "anime_list.json",
-                    strat.get("name"),
-                    +0.05
-                )
-                return results
-            else:
-                self.rules.update_score(
-                    "anime_list.json",
-                    strat.get("name"),
-                    -0.05
-                )
-
-        return []
+    def _extract_with_rules(self, html, url=None):
+        soup = parse_html(html)
+
+        # ordem das strategies e registro de sucesso/custo: rules/bandit.py
+        return run_strategies(
+            self.rules,
+            "anime_list.json",
+            "card",
+            lambda strat: self._apply_strategy(soup, strat),
+            html=html,
+            url=url
+        )
 
     # --------------------------------------------------
     # APLICA UMA STRATEGY
     # --------------------------------------------------
     def _apply_strategy(self, soup, strat):
-        selector = strat.get("selector")
-        fields = strat.get("fields", {})
-
-        if not selector or not fields:
+        if not strat.valid:
             return []
 
-        cards = soup.select(selector)
         animes = []
         vistos = set()
 
-        for card in cards:
-            item = {}
-
-            for name, rule in fields.items():
-                el = card.select_one(rule.get("selector"))
-                if not el:
-                    item = {}
-                    break
-
-                if rule.get("type") == "text":
-                    item[name] = el.get_text(" ", strip=True)
-
-                elif rule.get("type") == "css":
-                    attr = rule.get("attr")
-                    item[name] = el.get(attr)
-
-            if not item:
-                continue
-
+        # extração campo a campo segue o plano compilado (rules/compiled.py)
+        for item in strat.extract(soup):
             # ð normaliza link
             if "link" in item:
                 item["link"] = urljoin(BASE, item["link"])
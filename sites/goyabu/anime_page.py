@@ -1,24 +1,53 @@
 # -*- coding: utf-8 -*-
 # sites/goyabu/anime_page.py
 
+import asyncio
 import re
 import json
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
 
 from core.fetcher import Fetcher
+from core.async_fetcher import AsyncFetcher
+from core.parser import parse_html
 from core.detector import BreakDetector
 from core.validator import Validator
 from rules.loader import RuleLoader
+from rules.bandit import run_strategies
 from ai.learner import RuleLearner
 
 BASE = "https://goyabu.io"
 
+ALL_EPISODES = re.compile(r"const allEpisodes\s*=\s*(\[[\s\S]*?\]);")
 
-class GoyabuAnimePageScraper:
+
+class AllEpisodesStop:
+    """
+    Condição de parada do download da página do anime: verdadeira assim
+    que o literal `const allEpisodes = [...];` estiver completo no texto lido.
+    """
+
+    MARCADOR = "const allEpisodes"
 
     def __init__(self):
+        self.inicio = None
+        self.lido = 0
+
+    def __call__(self, texto):
+        if self.inicio is None:
+            # recua o tamanho do marcador para não perder um que cruzou blocos
+            i = texto.find(self.MARCADOR, max(0, self.lido - len(self.MARCADOR)))
+            self.lido = len(texto)
+            if i < 0:
+                return False
+            self.inicio = i
+        return ALL_EPISODES.search(texto, self.inicio) is not None
+
+
+class GoyabuAnimePageScraper:
+
+    def __init__(self, async_fetcher=None):
         self.fetcher = Fetcher(base_url=BASE)
+        self.async_fetcher = async_fetcher or AsyncFetcher(base_url=BASE)
         self.rules = RuleLoader()
         self.learner = RuleLearner()
 
@@ -26,15 +55,35 @@ class GoyabuAnimePageScraper:
     # API PÚBLICA
     # --------------------------------------------------
     def listar_episodios(self, anime_url):
-        html = self.fetcher.get(anime_url)
+        # Lê só até o allEpisodes fechar; sem ele, cai no HTML completo
+        html, completo = self.fetcher.get_until(anime_url, AllEpisodesStop())
+        episodios = self._extract_from_js(html)
+        if episodios:
+            return episodios
+
+        if not completo:
+            html = self.fetcher.get(anime_url)
+        return self._processar(html, anime_url)
+
+    async def listar_episodios_async(self, anime_url):
+        html, completo = await self.async_fetcher.get_until(anime_url, AllEpisodesStop())
+        episodios = self._extract_from_js(html)
+        if episodios:
+            return episodios
+
+        if not completo:
+            html = await self.async_fetcher.get(anime_url)
+        # fora do loop: o fallback pode chamar a IA (RuleLearner), que é síncrona
+        return await asyncio.to_thread(self._processar, html, anime_url)
 
+    def _processar(self, html, anime_url):
         # 1) MÉTODO CORRETO PARA GOYABU (JS)
         episodios = self._extract_from_js(html)
         if episodios:
             return episodios
 
         # 2) FALLBACK: RULES (para aprendizado / compatibilidade)
-        episodios = self._extract_with_rules(html)
+        episodios = self._extract_with_rules(html, anime_url)
 
         # 3) SE TUDO FALHAR, IA APRENDE
         if BreakDetector.should_trigger_ai("episode_page", episodios):
@@ -49,7 +98,7 @@ class GoyabuAnimePageScraper:
             self.learner.learn(context)
 
             # Tenta novamente extrair com as regras após aprendizado
-            episodios = self._extract_with_rules(html)
+            episodios = self._extract_with_rules(html, anime_url)
 
         return episodios
 
@@ -57,10 +106,7 @@ class GoyabuAnimePageScraper:
     # EXTRAÇÃO DIRETA DO JS (FONTE REAL)
     # --------------------------------------------------
     def _extract_from_js(self, html):
-        m = re.search(
-            r"const allEpisodes\s*=\s*(\[[\s\S]*?\]);",
-            html
-        )
+        m = ALL_EPISODES.search(html)
         if not m:
             return []
 
@@ -104,61 +150,30 @@ class GoyabuAnimePageScraper:
     # --------------------------------------------------
     # EXTRAÇÃO POR REGRAS (FALLBACK / IA)
     # --------------------------------------------------
-    def _extract_with_rules(self, html):
-        soup = BeautifulSoup(html, "html.parser")
-        strategies = self.rules.get_strategies("episode_page.json")
-
-        for strat in strategies:
-            eps = self._apply_strategy(soup, strat)
-
-            if eps:
-                self.rules.update_score(
-                    "episode_page.json",
-                    strat.get("name"),
-                    +0.05
-                )
-                return eps
-            else:
-                self.rules.update_score(
-                    "episode_page.json",
-                    strat.get("name"),
-                    -0.05
-                )
-
-        return []
+    def _extract_with_rules(self, html, url=None):
+        soup = parse_html(html)
+
+        # ordem das strategies e registro de sucesso/custo: rules/bandit.py
+        return run_strategies(
+            self.rules,
+            "episode_page.json",
+            "card",
+            lambda strat: self._apply_strategy(soup, strat),
+            html=html,
+            url=url
+        )
 
     # --------------------------------------------------
     # APLICA UMA STRATEGY
     # --------------------------------------------------
     def _apply_strategy(self, soup, strat):
-        selector = strat.get("selector")
-        fields = strat.get("fields")
-
-        if not selector or not fields:
+        if not strat.valid:
             return []
 
-        items = soup.select(selector)
         episodios = []
         vistos = set()
 
-        for item in items:
-            ep = {}
-
-            for name, rule in fields.items():
-                el = item.select_one(rule.get("selector"))
-                if not el:
-                    ep = {}
-                    break
-
-                if rule.get("type") == "text":
-                    ep[name] = el.get_text(" ", strip=True)
-
-                elif rule.get("type") == "css":
-                    ep[name] = el.get(rule.get("attr"))
-
-            if not ep:
-                continue
-
+        for ep in strat.extract(soup):
             if "link" in ep:
                 ep["link"] = urljoin(BASE, ep["link"])
 
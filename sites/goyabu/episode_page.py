@@ -1,9 +1,25 @@
 import re
-from bs4 import BeautifulSoup
+from html import unescape
 from core.fetcher import Fetcher
+from core.async_fetcher import AsyncFetcher
+from core.parser import parse_html
+from rules.loader import RuleLoader
+from rules.bandit import run_strategies
 
 BASE = "https://goyabu.io"
 
+EPISODE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0.0.0 Safari/537.36"
+}
+
+# Fast path sem DOM: tags <button ...> (aspas respeitadas) e seus atributos
+BUTTON_TAG = re.compile(r"""<button\b((?:[^>"']|"[^"]*"|'[^']*')*)>""", re.I)
+TAG_ATTR = re.compile(r"""([^\s=/>]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+PLAYER_ATTR = "data-blogger-url-encrypted"
+HTML_COMMENT = re.compile(r"<!--.*?-->", re.S)  # botões comentados não são players
+
 
 class GoyabuEpisodePageScraper:
     """
@@ -12,9 +28,11 @@ class GoyabuEpisodePageScraper:
     - Retorna para o JSON sem resolver o GoogleVideo
     """
 
-    def __init__(self):
+    def __init__(self, async_fetcher=None):
         # Inicializa o fetcher com base URL
         self.fetcher = Fetcher(base_url=BASE)
+        self.async_fetcher = async_fetcher or AsyncFetcher(base_url=BASE)
+        self.rules = RuleLoader()
 
     # --------------------------------------------------
     def obter_streams(self, episode_url, retries=3, timeout=10):
@@ -25,15 +43,7 @@ class GoyabuEpisodePageScraper:
         html = None
         for attempt in range(1, retries + 1):
             try:
-                html = self.fetcher.get(
-                    episode_url,
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                                      "AppleWebKit/537.36 (KHTML, like Gecko) "
-                                      "Chrome/120.0.0.0 Safari/537.36"
-                    },
-                    timeout=timeout
-                )
+                html = self.fetcher.get(episode_url, headers=EPISODE_HEADERS, timeout=timeout)
                 if html:
                     break
             except Exception as e:
@@ -42,8 +52,31 @@ class GoyabuEpisodePageScraper:
                     print("❌ Não foi possível obter o episódio após várias tentativas")
                     return []
 
+        return self._streams_from_html(html, episode_url)
+
+    # --------------------------------------------------
+    async def obter_streams_async(self, episode_url, retries=3, timeout=10):
+        """
+        Versão assíncrona de obter_streams, com a mesma política de retries.
+        """
+        html = None
+        for attempt in range(1, retries + 1):
+            try:
+                html = await self.async_fetcher.get(episode_url, headers=EPISODE_HEADERS, timeout=timeout)
+                if html:
+                    break
+            except Exception as e:
+                print(f"⚠️ Tentativa {attempt} falhou: {e}")
+                if attempt == retries:
+                    print("❌ Não foi possível obter o episódio após várias tentativas")
+                    return []
+
+        return self._streams_from_html(html, episode_url)
+
+    # --------------------------------------------------
+    def _streams_from_html(self, html, url=None):
         # Extrai os players do HTML
-        players = self._extract_players_from_buttons(html)
+        players = self._extract_players_from_buttons(html, url)
         streams = []
 
         for player in players:
@@ -56,34 +89,73 @@ class GoyabuEpisodePageScraper:
         return streams
 
     # --------------------------------------------------
-    def _extract_players_from_buttons(self, html):
+    def _extract_players_from_buttons(self, html, url=None):
         """
-        Extrai todos os links codificados de botões de player do HTML
+        Extrai todos os links codificados de botões de player do HTML.
+        Tenta primeiro o fast path sem DOM; a árvore só é montada
+        (pelas rules de episode_page.json) se ele não achar nada.
         """
-        soup = BeautifulSoup(html, "html.parser")
+        encrypted = self._encrypted_from_tags(html)
+        if not encrypted:
+            encrypted = self._encrypted_with_rules(html, url)
 
         players = []
         vistos = set()
 
-        # Seleciona todos os botões com link codificado do Blogger
-        buttons = soup.select("button.player-tab[data-blogger-url-encrypted]")
-
-        for btn in buttons:
-            encrypted = btn.get("data-blogger-url-encrypted")
-            if not encrypted or encrypted in vistos:
+        for value in encrypted:
+            if not value or value in vistos:
                 continue
 
-            vistos.add(encrypted)
+            vistos.add(value)
 
             # Adiciona direto o link codificado
             players.append({
-                "url": encrypted,
+                "url": value,
                 "type": "blogger",
                 "source": "goyabu"
             })
 
         return players
 
+    # --------------------------------------------------
+    @staticmethod
+    def _encrypted_from_tags(html):
+        """
+        Lê data-blogger-url-encrypted de <button class="player-tab ...">
+        direto do texto, sem montar a árvore.
+        """
+        if not html or PLAYER_ATTR not in html:
+            return []
+
+        if "<!--" in html:
+            html = HTML_COMMENT.sub("", html)
+
+        values = []
+        for tag in BUTTON_TAG.finditer(html):
+            attrs = tag.group(1)
+            if PLAYER_ATTR not in attrs:
+                continue
+
+            found = {}
+            for m in TAG_ATTR.finditer(attrs):
+                found.setdefault(m.group(1).lower(), unescape(next(v for v in m.groups()[1:] if v is not None)))
+
+            if "player-tab" in found.get("class", "").split() and found.get(PLAYER_ATTR):
+                values.append(found[PLAYER_ATTR])
+
+        return values
+
+    def _encrypted_with_rules(self, html, url=None):
+        soup = parse_html(html)
+        return run_strategies(
+            self.rules,
+            "episode_page.json",
+            "attr",
+            lambda strat: strat.extract(soup) if strat.valid else [],
+            html=html,
+            url=url
+        )
+
     # --------------------------------------------------
     # UTILITÁRIO
     # --------------------------------------------------